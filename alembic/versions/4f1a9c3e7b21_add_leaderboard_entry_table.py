@@ -0,0 +1,45 @@
+"""Add leaderboard_entry table
+
+Revision ID: 4f1a9c3e7b21
+Revises: ae12e318dccc
+Create Date: 2026-10-19 10:12:41.518203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4f1a9c3e7b21'
+down_revision: Union[str, Sequence[str], None] = 'ae12e318dccc'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('leaderboard_entry',
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('period', sa.VARCHAR(length=7), nullable=False),
+    sa.Column('tier', sa.VARCHAR(length=16), nullable=False),
+    sa.Column('tournaments', sa.INTEGER(), nullable=False),
+    sa.Column('cost', sa.INTEGER(), nullable=False),
+    sa.Column('profit', sa.INTEGER(), nullable=False),
+    sa.Column('updated_at', postgresql.TIMESTAMP(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'period', 'tier')
+    )
+    op.create_index('ix_leaderboard_entry_period_tier_profit', 'leaderboard_entry', ['period', 'tier', 'profit'], unique=False)
+    # Пересчёт игрока за месяц ищет турниры по coalesce(play_date, created_at)
+    op.create_index('ix_torney_user_id_moment', 'torney', ['user_id', sa.text('coalesce(play_date, created_at)')], unique=False)
+    # Агрегаты заполняются командой: python -m app.leaderboard
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_torney_user_id_moment', table_name='torney')
+    op.drop_index('ix_leaderboard_entry_period_tier_profit', table_name='leaderboard_entry')
+    op.drop_table('leaderboard_entry')
@@ -0,0 +1,52 @@
+"""Add job table
+
+Revision ID: b7d2e05c9a44
+Revises: 4f1a9c3e7b21
+Create Date: 2026-10-19 11:03:27.904518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d2e05c9a44'
+down_revision: Union[str, Sequence[str], None] = '4f1a9c3e7b21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('job',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('kind', sa.VARCHAR(length=64), nullable=False),
+    sa.Column('payload', sa.JSON(), nullable=False),
+    sa.Column('status', sa.VARCHAR(length=16), nullable=False),
+    sa.Column('progress', sa.FLOAT(), nullable=False),
+    sa.Column('message', sa.VARCHAR(length=255), nullable=True),
+    sa.Column('result', sa.JSON(), nullable=True),
+    sa.Column('error', sa.VARCHAR(), nullable=True),
+    sa.Column('attempts', sa.INTEGER(), nullable=False),
+    sa.Column('max_attempts', sa.INTEGER(), nullable=False),
+    sa.Column('run_after', postgresql.TIMESTAMP(), nullable=False),
+    sa.Column('locked_by', sa.VARCHAR(length=255), nullable=True),
+    sa.Column('locked_at', postgresql.TIMESTAMP(), nullable=True),
+    sa.Column('created_at', postgresql.TIMESTAMP(), nullable=False),
+    sa.Column('updated_at', postgresql.TIMESTAMP(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_job_status_run_after', 'job', ['status', 'run_after'], unique=False)
+    op.create_index(op.f('ix_job_user_id'), 'job', ['user_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_job_user_id'), table_name='job')
+    op.drop_index('ix_job_status_run_after', table_name='job')
+    op.drop_table('job')
@@ -0,0 +1,39 @@
+"""Add trigram index on torney name
+
+Revision ID: d3a8f61b5c17
+Revises: c91e4d7a2f08
+Create Date: 2026-10-19 13:20:52.146730
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3a8f61b5c17'
+down_revision: Union[str, Sequence[str], None] = 'c91e4d7a2f08'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # pg_trgm - нечёткий поиск, btree_gin - чтобы user_id был в том же GIN-индексе
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.execute('CREATE EXTENSION IF NOT EXISTS btree_gin')
+    op.create_index(
+        'ix_torney_user_name_trgm',
+        'torney',
+        ['user_id', 'name'],
+        unique=False,
+        postgresql_using='gin',
+        postgresql_ops={'name': 'gin_trgm_ops'},
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_torney_user_name_trgm', table_name='torney', postgresql_using='gin')
+    # Расширения не удаляем - ими могут пользоваться другие объекты
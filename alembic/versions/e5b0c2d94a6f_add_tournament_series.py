@@ -0,0 +1,67 @@
+"""Add tournament_series dimension and torney.series_id
+
+Revision ID: e5b0c2d94a6f
+Revises: d3a8f61b5c17
+Create Date: 2026-10-19 14:02:33.581904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b0c2d94a6f'
+down_revision: Union[str, Sequence[str], None] = 'd3a8f61b5c17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('tournament_series',
+    sa.Column('id', sa.INTEGER(), nullable=False),
+    sa.Column('name', sa.VARCHAR(length=255), nullable=False),
+    sa.Column('name_key', sa.VARCHAR(length=255), nullable=False),
+    sa.Column('site', sa.VARCHAR(length=64), nullable=False),
+    sa.Column('buy_in', sa.INTEGER(), nullable=False),
+    sa.Column('created_at', postgresql.TIMESTAMP(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name_key', 'site', 'buy_in', name='uq_tournament_series_key')
+    )
+    op.add_column('torney', sa.Column('series_id', sa.INTEGER(), nullable=True))
+    op.create_foreign_key('torney_series_id_fkey', 'torney', 'tournament_series', ['series_id'], ['id'])
+
+    # Дедупликация существующих турниров: одна серия на (название без регистра и лишних пробелов, бай-ин).
+    # Название серии берётся из самой ранней записи
+    op.execute("""
+        INSERT INTO tournament_series (name, name_key, site, buy_in, created_at)
+        SELECT DISTINCT ON (name_key, buy_in) name, name_key, '', buy_in, now()
+        FROM (
+            SELECT regexp_replace(btrim(name), '\\s+', ' ', 'g') AS name,
+                   lower(regexp_replace(btrim(name), '\\s+', ' ', 'g')) AS name_key,
+                   coalesce(buy_in, 0) AS buy_in,
+                   created_at
+            FROM torney
+        ) AS normalized
+        ORDER BY name_key, buy_in, created_at
+    """)
+    op.execute("""
+        UPDATE torney
+        SET series_id = tournament_series.id
+        FROM tournament_series
+        WHERE tournament_series.name_key = lower(regexp_replace(btrim(torney.name), '\\s+', ' ', 'g'))
+          AND tournament_series.site = ''
+          AND tournament_series.buy_in = coalesce(torney.buy_in, 0)
+    """)
+    op.create_index('ix_torney_user_id_series_id', 'torney', ['user_id', 'series_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_torney_user_id_series_id', table_name='torney')
+    op.drop_constraint('torney_series_id_fkey', 'torney', type_='foreignkey')
+    op.drop_column('torney', 'series_id')
+    op.drop_table('tournament_series')
@@ -0,0 +1,152 @@
+import uuid
+from datetime import datetime
+from typing import NamedTuple
+
+import numpy as np
+from sqlalchemy import func
+from sqlmodel import Session, select
+
+from app.metrics import moment_expr, utc_naive
+from app.models import Torney
+
+# Аналитика по истории турниров игрока. Данные забираются одним запросом
+# в виде колонок и считаются векторно в NumPy, без ORM-объектов.
+
+
+class TourneyColumns(NamedTuple):
+    play_date: np.ndarray  # datetime64[us]
+    buy_in: np.ndarray  # int64, дальше везде так же
+    re_entry: np.ndarray
+    bounty: np.ndarray
+    prize: np.ndarray
+
+    def __len__(self) -> int:
+        return self.buy_in.size
+
+    @property
+    def cost(self) -> np.ndarray:
+        return self.buy_in * (1 + self.re_entry)
+
+    @property
+    def profit(self) -> np.ndarray:
+        return self.prize + self.bounty - self.cost
+
+
+def columns_from_rows(rows: list[tuple]) -> TourneyColumns:
+    count = len(rows)
+    if not count:
+        empty = np.zeros(0, dtype=np.int64)
+        return TourneyColumns(np.zeros(0, dtype="datetime64[us]"), empty, empty, empty, empty)
+    dates, buy_in, re_entry, bounty, prize = zip(*rows)
+    return TourneyColumns(
+        play_date=np.array(dates, dtype="datetime64[us]"),
+        buy_in=np.fromiter(buy_in, dtype=np.int64, count=count),
+        re_entry=np.fromiter(re_entry, dtype=np.int64, count=count),
+        bounty=np.fromiter(bounty, dtype=np.int64, count=count),
+        prize=np.fromiter(prize, dtype=np.int64, count=count),
+    )
+
+
+def fetch_columns(
+    session: Session,
+    user_id: uuid.UUID,
+    start_date: datetime | None = None,
+    end_date: datetime | None = None,
+) -> TourneyColumns:
+    """Турниры игрока в хронологическом порядке, NULL уже заменены нулями"""
+    statement = select(
+        moment_expr,
+        func.coalesce(Torney.buy_in, 0),
+        func.coalesce(Torney.re_entry, 0),
+        func.coalesce(Torney.bounty, 0),
+        func.coalesce(Torney.prize, 0),
+    ).where(Torney.user_id == user_id)
+    if start_date:
+        statement = statement.where(moment_expr >= utc_naive(start_date))
+    if end_date:
+        statement = statement.where(moment_expr <= utc_naive(end_date))
+    statement = statement.order_by(moment_expr, Torney.id)
+    return columns_from_rows(session.exec(statement).all())
+
+
+def _rolling_sum(values: np.ndarray, window: int) -> np.ndarray:
+    # Суммы в int64 точные, поэтому разность кумулятивных сумм не копит ошибку
+    sums = np.cumsum(values)
+    result = sums.copy()
+    result[window:] -= sums[:-window]
+    return result
+
+
+def downsample_indices(count: int, points: int, keep: tuple[int, ...] = ()) -> np.ndarray:
+    """Равномерная выборка индексов кривой плюс обязательные точки (пик и дно просадки)"""
+    if count <= points:
+        return np.arange(count)
+    indices = np.linspace(0, count - 1, points).round().astype(np.int64)
+    return np.union1d(indices, np.asarray([i for i in keep if 0 <= i < count], dtype=np.int64))
+
+
+def _nan_to_none(values: np.ndarray) -> list[float | None]:
+    return [None if np.isnan(value) else round(value, 2) for value in values.tolist()]
+
+
+def compute_curve(columns: TourneyColumns, points: int = 200, window: int = 100) -> dict:
+    """
+    Кривая прибыли, просадка, скользящие ROI и стандартное отклонение.
+    Серии считаются по всем турнирам и потом прореживаются до points точек.
+    """
+    count = len(columns)
+    cost = columns.cost
+    profit = columns.profit
+    summary = {
+        "tournaments": count,
+        "total_cost": int(cost.sum()),
+        "total_profit": int(profit.sum()),
+        "roi": None,
+        "stddev": None,
+        "max_drawdown": 0,
+        "max_drawdown_start": None,
+        "max_drawdown_end": None,
+    }
+    if count == 0:
+        return {**summary, "play_date": [], "cumulative_profit": [], "drawdown": [], "rolling_roi": [], "rolling_stddev": []}
+
+    if summary["total_cost"] > 0:
+        summary["roi"] = round(summary["total_profit"] / summary["total_cost"] * 100, 2)
+    if count > 1:
+        summary["stddev"] = round(float(profit.std(ddof=1)), 2)
+
+    cumulative = np.cumsum(profit)
+    # Пик считается от нулевого старта: первая же минусовая серия - тоже просадка
+    peaks = np.maximum(np.maximum.accumulate(cumulative), 0)
+    drawdown = peaks - cumulative
+    trough = int(drawdown.argmax())
+    peak = -1
+    if drawdown[trough] > 0:
+        summary["max_drawdown"] = int(drawdown[trough])
+        summary["max_drawdown_end"] = columns.play_date[trough].item()
+        head = cumulative[: trough + 1]
+        if head.max() > 0:
+            peak = int(head.argmax())
+            summary["max_drawdown_start"] = columns.play_date[peak].item()
+
+    window = max(1, min(window, count))
+    sizes = np.minimum(np.arange(1, count + 1), window)
+    window_cost = _rolling_sum(cost, window)
+    window_profit = _rolling_sum(profit, window)
+    rolling_roi = np.full(count, np.nan)
+    np.divide(window_profit * 100.0, window_cost, out=rolling_roi, where=window_cost > 0)
+
+    mean = window_profit / sizes
+    variance = _rolling_sum(profit * profit, window) / sizes - mean * mean
+    rolling_stddev = np.full(count, np.nan)
+    np.sqrt(np.maximum(variance, 0) * sizes / np.maximum(sizes - 1, 1), out=rolling_stddev, where=sizes > 1)
+
+    indices = downsample_indices(count, points, keep=(peak, trough))
+    return {
+        **summary,
+        "play_date": columns.play_date[indices].tolist(),
+        "cumulative_profit": cumulative[indices].tolist(),
+        "drawdown": drawdown[indices].tolist(),
+        "rolling_roi": _nan_to_none(rolling_roi[indices]),
+        "rolling_stddev": _nan_to_none(rolling_stddev[indices]),
+    }
@@ -1,6 +1,6 @@
 from sqlmodel import Session, SQLModel, select
 from collections.abc import Generator
-from app.core.db import engine
+from app.core.db import get_engine
 from typing import Annotated
 from fastapi import FastAPI, Depends, HTTPException, status
 from app.core.security import get_current_user_id
@@ -8,7 +8,7 @@ from app import crud
 from app.models import User
 
 def get_db() -> Generator[Session, None, None]:
-    with Session(engine) as session:
+    with Session(get_engine()) as session:
         yield session
 
 def get_current_user(
@@ -1,8 +1,14 @@
 from fastapi import APIRouter
 
-from app.api.routes import tourney, auth, user
+from app.api.routes import tourney, auth, user, leaderboard, analytics, jobs, series, stats, events
 
 api_router = APIRouter()
 api_router.include_router(auth.router, prefix="/auth")
 api_router.include_router(user.router, prefix="/user")
-api_router.include_router(tourney.router)
\ No newline at end of file
+api_router.include_router(tourney.router)
+api_router.include_router(leaderboard.router)
+api_router.include_router(analytics.router)
+api_router.include_router(jobs.router)
+api_router.include_router(series.router)
+api_router.include_router(stats.router)
+api_router.include_router(events.router)
\ No newline at end of file
@@ -0,0 +1,58 @@
+from datetime import datetime
+
+from fastapi import APIRouter, HTTPException, Query
+
+from app.api.deps import SessionDep, CurrentUser
+from app.core.config import settings
+from app.models import AnalyticsCurve, SimulationRequest, SimulationResult
+
+router = APIRouter(prefix="/analytics", tags=["Аналитика"])
+
+
+@router.get("/curve", response_model=AnalyticsCurve)
+def get_curve(
+    db: SessionDep,
+    current_user: CurrentUser,
+    start_date: datetime | None = None,
+    end_date: datetime | None = None,
+    points: int = Query(default=200, ge=2, le=5000),
+    window: int = Query(default=100, ge=1, le=10000),
+):
+    """
+    Кривая прибыли, максимальная просадка, скользящие ROI и стандартное отклонение
+    за всю историю (или за период). Кривая прореживается до points точек,
+    скользящие метрики считаются по последним window турнирам.
+    """
+    # NumPy грузится при первом обращении, а не при старте воркера
+    from app import analytics
+
+    columns = analytics.fetch_columns(db, current_user.id, start_date, end_date)
+    return analytics.compute_curve(columns, points=points, window=window)
+
+
+@router.post("/risk-of-ruin", response_model=SimulationResult)
+def simulate_risk_of_ruin(params: SimulationRequest, db: SessionDep, current_user: CurrentUser):
+    """
+    Монте-Карло по истории игрока: риск разорения при заданном банкролле,
+    ожидаемый даунсвинг и полосы 5-95 перцентилей. Одинаковый seed - одинаковый результат.
+    """
+    from app import analytics, simulation
+
+    if params.horizon > settings.SIMULATION_MAX_HORIZON:
+        raise HTTPException(status_code=422, detail=f"horizon не больше {settings.SIMULATION_MAX_HORIZON}")
+    if params.simulations > settings.SIMULATION_MAX_PATHS:
+        raise HTTPException(status_code=422, detail=f"simulations не больше {settings.SIMULATION_MAX_PATHS}")
+    if params.horizon * params.simulations > settings.SIMULATION_MAX_STEPS:
+        raise HTTPException(status_code=422, detail="Слишком большая симуляция: уменьшите horizon или simulations")
+
+    profits = analytics.fetch_columns(db, current_user.id).profit
+    if profits.size < settings.SIMULATION_MIN_SAMPLE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Для симуляции нужно минимум {settings.SIMULATION_MIN_SAMPLE} турниров в истории",
+        )
+
+    try:
+        return simulation.simulate(profits, params.bankroll, params.horizon, params.simulations, params.seed)
+    except simulation.SimulationBudgetExceeded:
+        raise HTTPException(status_code=503, detail="Симуляция не уложилась в лимит времени, попробуйте позже")
@@ -7,8 +7,8 @@ from fastapi.security import OAuth2PasswordRequestForm
 from app import crud
 from app.api.deps import SessionDep
 from app.core.config import settings
-from app.core.security import verify_password, create_access_token, create_refresh_token, verify_refresh_token
-from app.models import Token, TokenWithRefresh, RefreshTokenRequest, UserPublic, UserRegister, UserLogin, Message
+from app.core.security import verify_password, create_access_token, create_refresh_token, verify_refresh_token, verify_token, reusable_oauth2
+from app.models import TokenWithRefresh, RefreshTokenRequest, LogoutRequest, UserPublic, UserRegister, UserLogin, Message
 from app.api.deps import get_current_user
 
 
@@ -80,14 +80,16 @@ def login_form(
 			"token_type": "bearer"
 		}
 
-@router.post('/refresh-token', response_model=Token)
+@router.post('/refresh-token', response_model=TokenWithRefresh)
 def refresh_token(
+    session: SessionDep,
     request: RefreshTokenRequest | None = None,
     refresh_token: str | None = None
 ):
     """
     Refresh access token using refresh token.
     Accepts token either in request body or as query parameter.
+    Refresh token is rotated: the old one is revoked and a new one is returned.
     """
     # Get token from body or query parameter
     token = None
@@ -102,24 +104,48 @@ def refresh_token(
             detail="refresh_token is required either in request body or as query parameter"
         )
     
-    user_id = verify_refresh_token(token)
-    if not user_id:
+    token_data = verify_refresh_token(token)
+    if not token_data or not token_data.sub:
         raise HTTPException(
             status_code=401,
             detail="Неверный или просроченный токен обновления"
         )
+
+    # Ротация: старый токен отзывается, повторно обменять его нельзя
+    if token_data.jti and not crud.revoke_token(session=session, token_data=token_data):
+        raise HTTPException(
+            status_code=401,
+            detail="Токен обновления уже использован"
+        )
     
-    # Create new access token
+    # Create new access and refresh tokens
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    new_access_token = create_access_token(user_id, expires_delta=access_token_expires)
+    new_access_token = create_access_token(token_data.sub, expires_delta=access_token_expires)
+
+    refresh_token_expires = timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    new_refresh_token = create_refresh_token(token_data.sub, expires_delta=refresh_token_expires)
     
-    return {"access_token": new_access_token, "token_type": "bearer"}
+    return {"access_token": new_access_token, "refresh_token": new_refresh_token, "token_type": "bearer"}
 
 
 @router.post('/logout', response_model=Message)
-def logout(current_user: Annotated[Any, Depends(get_current_user)]):
+def logout(
+    session: SessionDep,
+    current_user: Annotated[Any, Depends(get_current_user)],
+    token: Annotated[str, Depends(reusable_oauth2)],
+    request: LogoutRequest | None = None,
+):
     """
-    Logout current user
+    Logout current user: revokes the access token and, if passed, the refresh token
     """
+    access_data = verify_token(token)
+    if access_data and access_data.jti:
+        crud.revoke_token(session=session, token_data=access_data)
+
+    if request and request.refresh_token:
+        refresh_data = verify_refresh_token(request.refresh_token)
+        if refresh_data and refresh_data.jti and refresh_data.sub == str(current_user.id):
+            crud.revoke_token(session=session, token_data=refresh_data)
+
     return {"message": "User logged out successfully"}
 
@@ -0,0 +1,101 @@
+import asyncio
+from collections.abc import AsyncIterator
+from typing import Annotated
+
+from datetime import timedelta
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from fastapi.security import OAuth2PasswordBearer
+
+from app.core.config import settings
+from app.core.security import create_stream_token, get_current_user_id, verify_stream_token
+from app.events import HEARTBEAT, TooManyConnections, hub
+from app.models import StreamToken
+
+router = APIRouter(prefix="/events", tags=["События"])
+
+# Заголовок необязателен: вместо него может прийти ?token=
+optional_oauth2 = OAuth2PasswordBearer(tokenUrl="/v1/auth/login/form", auto_error=False)
+
+
+async def _stream(request: Request, subscription) -> AsyncIterator[str]:
+    try:
+        # Через сколько переподключаться после обрыва (мс)
+        yield "retry: 3000\n\n"
+        while True:
+            try:
+                message = await asyncio.wait_for(
+                    subscription.queue.get(), timeout=settings.EVENTS_HEARTBEAT_SECONDS
+                )
+            except asyncio.TimeoutError:
+                # Комментарий SSE: держит соединение через прокси и выявляет отвалившихся клиентов
+                if await request.is_disconnected():
+                    return
+                yield HEARTBEAT
+                continue
+            if message is None:
+                return
+            yield message
+    finally:
+        hub.unsubscribe(subscription)
+
+
+def get_stream_user_id(
+    header_token: Annotated[str | None, Depends(optional_oauth2)],
+    token: Annotated[str | None, Query(description="Токен из POST /events/token - для EventSource")] = None,
+) -> str:
+    """Access-токен в заголовке (fetch) или короткий stream-токен в URL (EventSource)"""
+    if token is not None:
+        token_data = verify_stream_token(token)
+        if token_data and token_data.sub:
+            return token_data.sub
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+        )
+    if header_token is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return get_current_user_id(header_token)
+
+
+@router.post("/token", response_model=StreamToken)
+def create_events_token(current_user_id: Annotated[str, Depends(get_current_user_id)]):
+    """
+    Токен для new EventSource("/v1/events/stream?token=..."): браузерный EventSource
+    не передаёт заголовок Authorization. Проверяется только при подключении - после обрыва
+    соединения клиент берёт новый токен и открывает стрим заново.
+    """
+    expires_in = settings.EVENTS_TOKEN_EXPIRE_SECONDS
+    return StreamToken(
+        token=create_stream_token(current_user_id, timedelta(seconds=expires_in)),
+        expires_in=expires_in,
+    )
+
+
+@router.get("/stream")
+async def stream_events(
+    request: Request,
+    current_user_id: Annotated[str, Depends(get_stream_user_id)],
+):
+    """
+    Server-sent events для всех устройств игрока:
+    tournament.created / tournament.updated / tournament.deleted с итогами сессии (дня турнира),
+    resync - часть событий потеряна, нужно перечитать данные целиком.
+    Без сессии БД: пользователь берётся из токена.
+    """
+    if not settings.EVENTS_ENABLED:
+        raise HTTPException(status_code=404, detail="Живые события отключены")
+    try:
+        subscription = hub.subscribe(current_user_id)
+    except TooManyConnections:
+        raise HTTPException(status_code=429, detail="Слишком много открытых подключений")
+    return StreamingResponse(
+        _stream(request, subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,39 @@
+from uuid import UUID
+
+from fastapi import APIRouter, HTTPException
+from sqlmodel import select
+
+from app import jobs
+from app.api.deps import SessionDep, CurrentUser
+from app.models import Job, JobCreate, JobRead
+
+router = APIRouter(prefix="/jobs", tags=["Задачи"])
+
+
+@router.post("/", response_model=JobRead, status_code=202)
+def create_job(job_in: JobCreate, db: SessionDep, current_user: CurrentUser):
+    """
+    Поставить фоновую задачу в очередь. Статус и прогресс - GET /jobs/{id}.
+    """
+    if job_in.kind not in jobs.USER_JOB_KINDS:
+        raise HTTPException(status_code=422, detail=f"Неизвестный тип задачи: {job_in.kind}")
+    return jobs.enqueue(db, job_in.kind, job_in.payload, user_id=current_user.id)
+
+
+@router.get("/", response_model=list[JobRead])
+def get_my_jobs(db: SessionDep, current_user: CurrentUser, limit: int = 50):
+    query = (
+        select(Job)
+        .where(Job.user_id == current_user.id)
+        .order_by(Job.created_at.desc())
+        .limit(min(limit, 200))
+    )
+    return db.exec(query).all()
+
+
+@router.get("/{job_id}", response_model=JobRead)
+def get_job(job_id: UUID, db: SessionDep, current_user: CurrentUser):
+    job = db.get(Job, job_id)
+    if not job or job.user_id != current_user.id:
+        raise HTTPException(status_code=404, detail="Задача не найдена")
+    return job
@@ -0,0 +1,57 @@
+from datetime import datetime, timezone
+from typing import Literal
+
+from fastapi import APIRouter, HTTPException, Query
+
+from app import leaderboard
+from app.api.deps import SessionDep, CurrentUser
+from app.metrics import TIER_NAMES
+from app.models import LeaderboardPage, LeaderboardRank, LeaderboardRow
+
+router = APIRouter(prefix="/leaderboards", tags=["Лидерборды"])
+
+Metric = Literal["profit", "roi", "volume"]
+
+
+def _resolve(period: str | None, tier: str) -> str:
+    if tier not in TIER_NAMES:
+        raise HTTPException(status_code=422, detail=f"Неизвестная ступень бай-ина: {tier}")
+    return period or leaderboard.period_key(datetime.now(timezone.utc))
+
+
+@router.get("/{metric}", response_model=LeaderboardPage)
+def get_leaderboard(
+    metric: Metric,
+    db: SessionDep,
+    period: str | None = Query(default=None, pattern=r"^\d{4}-(0[1-9]|1[0-2])$"),
+    tier: str = "all",
+    limit: int = Query(default=50, ge=1, le=200),
+    offset: int = Query(default=0, ge=0),
+):
+    """
+    Топ игроков за месяц (по умолчанию текущий) по прибыли, ROI или объёму.
+    """
+    period = _resolve(period, tier)
+    total, rows = leaderboard.boards.page(db, metric, period, tier, offset, limit)
+    names = leaderboard.user_names(db, [user_id for _, user_id, _ in rows])
+    items = [
+        LeaderboardRow(rank=rank, user_id=user_id, full_name=names.get(user_id), value=value)
+        for rank, user_id, value in rows
+    ]
+    return LeaderboardPage(metric=metric, period=period, tier=tier, total=total, items=items)
+
+
+@router.get("/{metric}/me", response_model=LeaderboardRank)
+def get_my_rank(
+    metric: Metric,
+    db: SessionDep,
+    current_user: CurrentUser,
+    period: str | None = Query(default=None, pattern=r"^\d{4}-(0[1-9]|1[0-2])$"),
+    tier: str = "all",
+):
+    """
+    Место текущего пользователя в лидерборде.
+    """
+    period = _resolve(period, tier)
+    total, rank, value = leaderboard.boards.position(db, metric, period, tier, current_user.id)
+    return LeaderboardRank(metric=metric, period=period, tier=tier, total=total, rank=rank, value=value)
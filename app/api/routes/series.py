@@ -0,0 +1,68 @@
+from fastapi import APIRouter, HTTPException, Query
+from sqlalchemy import case, func
+from sqlmodel import select
+
+from app.api.deps import SessionDep, CurrentUser
+from app.metrics import cost_expr, moment_expr, profit_expr
+from app.models import SeriesStats, Torney, TournamentSeries
+
+router = APIRouter(prefix="/series", tags=["Серии"])
+
+
+def _stats_query(user_id, series_id: int | None = None):
+    # Агрегируем по целому series_id, а названия подтягиваем только для итоговых строк
+    aggregated = select(
+        Torney.series_id.label("series_id"),
+        func.count().label("tournaments"),
+        func.sum(cost_expr).label("cost"),
+        func.sum(profit_expr).label("profit"),
+        func.sum(case((Torney.prize > 0, 1), else_=0)).label("itm"),
+        func.max(moment_expr).label("last_played"),
+    ).where(Torney.user_id == user_id, Torney.series_id.is_not(None))
+    if series_id is not None:
+        aggregated = aggregated.where(Torney.series_id == series_id)
+    aggregated = aggregated.group_by(Torney.series_id).subquery()
+
+    return select(TournamentSeries, aggregated).join(aggregated, aggregated.c.series_id == TournamentSeries.id)
+
+
+def _to_stats(series: TournamentSeries, row) -> SeriesStats:
+    cost = row.cost or 0
+    profit = row.profit or 0
+    return SeriesStats(
+        series_id=series.id,
+        name=series.name,
+        site=series.site,
+        buy_in=series.buy_in,
+        tournaments=row.tournaments,
+        cost=cost,
+        profit=profit,
+        roi=round(profit / cost * 100, 2) if cost > 0 else None,
+        itm=row.itm or 0,
+        last_played=row.last_played,
+    )
+
+
+@router.get("/", response_model=list[SeriesStats])
+def get_my_series(
+    db: SessionDep,
+    current_user: CurrentUser,
+    order_by: str = Query(default="tournaments", pattern="^(tournaments|profit|last_played)$"),
+    limit: int = Query(default=50, ge=1, le=200),
+    offset: int = Query(default=0, ge=0),
+):
+    """
+    Статистика по сериям турниров текущего пользователя.
+    """
+    query = _stats_query(current_user.id)
+    sort_column = query.selected_columns[order_by]
+    query = query.order_by(sort_column.desc().nulls_last(), TournamentSeries.id).offset(offset).limit(limit)
+    return [_to_stats(row[0], row) for row in db.exec(query).all()]
+
+
+@router.get("/{series_id}", response_model=SeriesStats)
+def get_series_stats(series_id: int, db: SessionDep, current_user: CurrentUser):
+    row = db.exec(_stats_query(current_user.id, series_id)).first()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Серия не найдена")
+    return _to_stats(row[0], row)
@@ -0,0 +1,25 @@
+from datetime import date
+
+from fastapi import APIRouter, HTTPException
+
+from app.api.deps import SessionDep, CurrentUser
+from app.models import UserStats
+from app.snapshots import snapshots
+
+router = APIRouter(prefix="/stats", tags=["Статистика"])
+
+
+@router.get("/", response_model=UserStats)
+def get_my_stats(
+    db: SessionDep,
+    current_user: CurrentUser,
+    start_date: date | None = None,
+    end_date: date | None = None,
+):
+    """
+    Итоги игрока за период (включительно), по ступеням бай-ина и по дням.
+    Считается по снимку в памяти - для активного игрока без запросов к БД.
+    """
+    if start_date and end_date and start_date > end_date:
+        raise HTTPException(status_code=400, detail="start_date позже end_date")
+    return snapshots.summary(db, current_user.id, start_date, end_date)
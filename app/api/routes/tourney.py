@@ -1,21 +1,43 @@
-from typing import Any
+import os
+from typing import Annotated, Any, Literal
 from datetime import datetime, timezone
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
+from fastapi.responses import StreamingResponse
 from fastapi.security import HTTPAuthorizationCredentials
-from app.models import TorneyCreate, TorneyRead, Torney, TorneyUpdate
+from pydantic import StringConstraints
+from app.models import (
+    TorneyCreate, TorneyRead, Torney, TorneyUpdate, TorneySearchHit, TorneySearchPage,
+    TorneyWindow, TorneyBatchQuery, TorneyWindowResult, TorneyBatchResult, JobRead,
+)
 from app.api.deps import SessionDep, CurrentUser
+from app.core.db import get_engine
 import app.crud as crud
+from app import events, jobs, leaderboard
+from app.search import search_tournaments
+from app.metrics import TIER_NAMES, ALL_TIERS, cost_expr, moment_expr, tier_expr, tourney_moment, utc_naive, winnings_expr
+from app.snapshots import snapshots, stats_entry
 from uuid import UUID
-from sqlmodel import select
+from sqlalchemy import and_, func, or_, true
+from sqlmodel import Session, select
 router = APIRouter(prefix="/tournaments", tags=["Турниры"])
 
 @router.post("/", response_model=TorneyRead)
 def create_tournament(tournament: TorneyCreate, db: SessionDep, current_user: CurrentUser):
     # Создаем турнир от имени текущего пользователя
-    db_tournament = Torney.model_validate(tournament, update={"user_id": current_user.id})
+    series_id = crud.get_or_create_series(session=db, name=tournament.name, buy_in=tournament.buy_in)
+    db_tournament = Torney.model_validate(tournament, update={"user_id": current_user.id, "series_id": series_id})
+    moment = tourney_moment(db_tournament)
+    entry = stats_entry(db_tournament)
     db.add(db_tournament)
+    db.flush()
+    # Агрегаты лидерборда пишутся в той же транзакции, что и турнир
+    written = leaderboard.refresh_for_moments(db, current_user.id, [moment])
+    snapshot = snapshots.begin(current_user.id)
     db.commit()
+    leaderboard.apply_periods(current_user.id, written)
+    snapshots.apply(current_user.id, snapshot, new=entry)
     db.refresh(db_tournament)
+    events.publish_tournament(db, current_user.id, "created", db_tournament.model_dump(mode="json"), moment.date())
     return db_tournament
 
 @router.put('/{tourney_id}', response_model=TorneyRead)
@@ -34,17 +56,33 @@ def update_tournament(
     if str(db_tournament.user_id) != str(current_user.id):
         raise HTTPException(status_code=403, detail="Нет прав для редактирования этого турнира")
    
+    previous_moment = tourney_moment(db_tournament)
+    previous_entry = stats_entry(db_tournament)
+
     # Получаем данные для обновления (исключая unset поля)
     update_data = tournament.model_dump(exclude_unset=True)
     db_tournament.sqlmodel_update(update_data)
+    if "name" in update_data or "buy_in" in update_data:
+        db_tournament.series_id = crud.get_or_create_series(
+            session=db, name=db_tournament.name, buy_in=db_tournament.buy_in
+        )
     
     # Обновляем время изменения
     db_tournament.updated_at = datetime.now(timezone.utc)
     
     # Сохраняем изменения
+    moment = tourney_moment(db_tournament)
+    entry = stats_entry(db_tournament)
     db.add(db_tournament)
+    db.flush()
+    # Турнир мог переехать в другой месяц - пересчитываем оба
+    written = leaderboard.refresh_for_moments(db, current_user.id, [previous_moment, moment])
+    snapshot = snapshots.begin(current_user.id)
     db.commit()
+    leaderboard.apply_periods(current_user.id, written)
+    snapshots.apply(current_user.id, snapshot, old=previous_entry, new=entry)
     db.refresh(db_tournament)
+    events.publish_tournament(db, current_user.id, "updated", db_tournament.model_dump(mode="json"), moment.date())
     
     return db_tournament
 
@@ -58,8 +96,16 @@ def remove_tournament(tourney_id: UUID, db: SessionDep, current_user: CurrentUse
     if str(tournament.user_id) != str(current_user.id):
         raise HTTPException(status_code=403, detail="Нет прав для удаления этого турнира")
     
+    moment = tourney_moment(tournament)
+    entry = stats_entry(tournament)
     db.delete(tournament)
+    db.flush()
+    written = leaderboard.refresh_for_moments(db, current_user.id, [moment])
+    snapshot = snapshots.begin(current_user.id)
     db.commit()
+    leaderboard.apply_periods(current_user.id, written)
+    snapshots.apply(current_user.id, snapshot, old=entry)
+    events.publish_tournament(db, current_user.id, "deleted", {"id": str(tourney_id)}, moment.date())
     
     return {"message": "Турнир успешно удален", "status_code": 200}
 
@@ -99,4 +145,141 @@ def get_my_tournaments(
     # Сортируем по дате проведения (новые сначала)
     tournaments.sort(key=lambda x: x.play_date if x.play_date else datetime.min.replace(tzinfo=timezone.utc), reverse=True)
     
-    return tournaments
\ No newline at end of file
+    return tournaments
+
+@router.get('/search', response_model=TorneySearchPage)
+def search_my_tournaments(
+    db: SessionDep,
+    current_user: CurrentUser,
+    # Пробелы по краям не считаются: q из одних пробелов - 422, а не все турниры подряд
+    q: Annotated[str, StringConstraints(strip_whitespace=True), Query(min_length=2, max_length=100)],
+    limit: int = Query(default=20, ge=1, le=100),
+    offset: int = Query(default=0, ge=0),
+):
+    """
+    Поиск по названию среди своих турниров: сначала совпадения с начала названия,
+    дальше по похожести (опечатки и порядок слов тоже находятся).
+    """
+    # Берём на одну строку больше, чтобы узнать, есть ли следующая страница
+    hits = search_tournaments(db, current_user.id, q, limit + 1, offset)
+    items = [
+        TorneySearchHit.model_validate(tournament, update={"score": round(score, 3)})
+        for tournament, score in hits[:limit]
+    ]
+    return TorneySearchPage(items=items, limit=limit, offset=offset, has_more=len(hits) > limit)
+
+
+def _window_predicate(window: TorneyWindow):
+    conditions = []
+    # Границы могут прийти со смещением, а колонки - UTC без зоны
+    if window.start_date:
+        conditions.append(moment_expr >= utc_naive(window.start_date))
+    if window.end_date:
+        conditions.append(moment_expr <= utc_naive(window.end_date))
+    if window.tier and window.tier != ALL_TIERS:
+        conditions.append(tier_expr == window.tier)
+    if window.series_id is not None:
+        conditions.append(Torney.series_id == window.series_id)
+    if window.min_buy_in is not None:
+        conditions.append(Torney.buy_in >= window.min_buy_in)
+    if window.max_buy_in is not None:
+        conditions.append(Torney.buy_in <= window.max_buy_in)
+    return and_(*conditions) if conditions else true()
+
+
+@router.post('/query', response_model=TorneyBatchResult)
+def query_tournament_windows(query: TorneyBatchQuery, db: SessionDep, current_user: CurrentUser):
+    """
+    Несколько именованных окон (сегодня, неделя, месяц, с начала года...) одним запросом.
+    Итоги всех окон считаются за один проход через агрегаты с FILTER (WHERE ...).
+    Дата турнира - play_date, а если её нет - дата создания.
+    """
+    for name, window in query.windows.items():
+        if window.tier is not None and window.tier not in TIER_NAMES:
+            raise HTTPException(status_code=422, detail=f"Неизвестная ступень бай-ина в окне {name}: {window.tier}")
+
+    names = list(query.windows)
+    predicates = [_window_predicate(query.windows[name]) for name in names]
+    # Строки вне всех окон не читаем вовсе
+    scope = and_(Torney.user_id == current_user.id, or_(*predicates))
+
+    columns = []
+    for predicate in predicates:
+        columns += [
+            func.count().filter(predicate),
+            func.coalesce(func.sum(cost_expr).filter(predicate), 0),
+            func.coalesce(func.sum(winnings_expr).filter(predicate), 0),
+            func.count().filter(and_(predicate, Torney.prize > 0)),
+        ]
+    row = db.exec(select(*columns).where(scope)).one()
+
+    results = {}
+    for index, name in enumerate(names):
+        count, cost, winnings, itm = row[index * 4:index * 4 + 4]
+        profit = winnings - cost
+        results[name] = TorneyWindowResult(
+            tournaments=count,
+            cost=cost,
+            winnings=winnings,
+            profit=profit,
+            roi=round(profit / cost * 100, 2) if cost > 0 else None,
+            itm=itm,
+            items=[] if query.include_tournaments else None,
+        )
+
+    if query.include_tournaments:
+        # Один проход по строкам: для каждой строки флаги, в какие окна она попала
+        flags = [predicate.label(f"w{index}") for index, predicate in enumerate(predicates)]
+        statement = select(Torney, *flags).where(scope).order_by(moment_expr.desc())
+        for tournament, *matched in db.exec(statement).all():
+            item = TorneyRead.model_validate(tournament)
+            for name, hit in zip(names, matched):
+                if hit:
+                    results[name].items.append(item)
+
+    return TorneyBatchResult(windows=results)
+
+
+@router.get('/export')
+def export_tournaments(
+    current_user: CurrentUser,
+    format: Literal["arrow", "parquet"] = "arrow",
+):
+    """
+    Все свои турниры в Arrow IPC (stream) или Parquet для pandas / DuckDB / polars.
+    Отдаётся потоком, пачками по COLUMNAR_BATCH_ROWS строк.
+    """
+    # PyArrow грузится при первом обращении, а не при старте воркера
+    from app import columnar
+
+    user_id = current_user.id
+
+    def body():
+        # Своя сессия: ответ читается уже после выхода из зависимостей роута
+        with Session(get_engine()) as session:
+            yield from columnar.write_stream(columnar.iter_batches(session, user_id), format)
+
+    filename = f"tournaments.{columnar.EXTENSIONS[format]}"
+    return StreamingResponse(
+        body(),
+        media_type=columnar.MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.post('/import', response_model=JobRead, status_code=202)
+def import_tournaments(db: SessionDep, current_user: CurrentUser, file: UploadFile = File(...)):
+    """
+    Загрузка турниров из Parquet или Arrow IPC (формат определяется по содержимому).
+    Обязательна колонка name; id, которые уже есть у игрока, пропускаются.
+    Файл обрабатывается фоновой задачей: прогресс и итог {imported, skipped} - GET /jobs/{id}.
+    """
+    from app import columnar
+
+    path = columnar.spool(file.file)
+    try:
+        # Повтор после ошибки задублировал бы строки без id - одна попытка
+        return jobs.enqueue(db, "tournaments_import", {"path": path}, user_id=current_user.id, max_attempts=1)
+    except Exception:
+        os.remove(path)
+        raise
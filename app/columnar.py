@@ -0,0 +1,246 @@
+import os
+import shutil
+import tempfile
+import uuid
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass, field as dataclass_field
+from datetime import datetime
+from typing import BinaryIO, Literal
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from sqlmodel import Session, select
+
+from app import crud
+from app.core.config import settings
+from app.metrics import tourney_moment
+from app.models import Torney, normalize_play_date
+
+# Турниры игрока в колоночных форматах для аналитиков (pandas, DuckDB, polars).
+# Пишем и читаем пачками (record batches): сервер не держит всю выборку в памяти,
+# клиент загружает Arrow без копирования. Время - UTC, деньги - int64.
+
+Format = Literal["arrow", "parquet"]
+
+MEDIA_TYPES: dict[str, str] = {
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+}
+EXTENSIONS: dict[str, str] = {"arrow": "arrows", "parquet": "parquet"}
+
+SCHEMA = pa.schema([
+    pa.field("id", pa.string(), nullable=False),
+    pa.field("name", pa.string(), nullable=False),
+    pa.field("play_date", pa.timestamp("us", tz="UTC")),
+    pa.field("buy_in", pa.int64()),
+    pa.field("re_entry", pa.int64()),
+    pa.field("bounty", pa.int64()),
+    pa.field("prize", pa.int64()),
+    pa.field("series_id", pa.int64()),
+    pa.field("created_at", pa.timestamp("us", tz="UTC")),
+    pa.field("updated_at", pa.timestamp("us", tz="UTC")),
+])
+# При импорте series_id назначается заново, created_at/updated_at - по умолчанию, если их нет
+IMPORT_COLUMNS = ("id", "name", "play_date", "buy_in", "re_entry", "bounty", "prize", "created_at", "updated_at")
+REQUIRED_COLUMNS = ("name",)
+# В Arrow деньги int64, а в таблице torney - INTEGER: большие значения отсекаем до INSERT
+INT32_COLUMNS = ("buy_in", "re_entry", "bounty", "prize")
+INT32_MIN, INT32_MAX = -(2**31), 2**31 - 1
+
+
+class ColumnarError(ValueError):
+    pass
+
+
+@dataclass
+class ImportProgress:
+    imported: int = 0
+    skipped: int = 0  # id уже есть у игрока
+    months: set[datetime] = dataclass_field(default_factory=set)  # для пересчёта лидербордов
+
+
+def iter_batches(session: Session, user_id: uuid.UUID, batch_rows: int | None = None) -> Iterator[pa.RecordBatch]:
+    """Турниры игрока пачками; в Postgres строки читаются серверным курсором"""
+    batch_rows = batch_rows or settings.COLUMNAR_BATCH_ROWS
+    statement = (
+        select(
+            Torney.id, Torney.name, Torney.play_date, Torney.buy_in, Torney.re_entry,
+            Torney.bounty, Torney.prize, Torney.series_id, Torney.created_at, Torney.updated_at,
+        )
+        .where(Torney.user_id == user_id)
+        .order_by(Torney.play_date, Torney.id)
+        .execution_options(yield_per=batch_rows)
+    )
+    for rows in session.exec(statement).partitions():
+        columns = list(zip(*rows))
+        columns[0] = [str(value) for value in columns[0]]
+        yield pa.RecordBatch.from_arrays(
+            [pa.array(values, type=field.type) for values, field in zip(columns, SCHEMA)],
+            schema=SCHEMA,
+        )
+
+
+class _Chunks:
+    """Файлоподобный приёмник: писатель Arrow/Parquet пишет сюда, мы отдаём накопленное кусками"""
+
+    def __init__(self) -> None:
+        self._parts: list[bytes] = []
+        self.closed = False
+
+    def write(self, data) -> int:
+        self._parts.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
+
+
+def write_stream(batches: Iterable[pa.RecordBatch], fmt: Format) -> Iterator[bytes]:
+    """Сериализует пачки по мере поступления - для StreamingResponse и записи в файл"""
+    sink = _Chunks()
+    if fmt == "parquet":
+        writer = pq.ParquetWriter(sink, SCHEMA, compression="zstd")
+        write = writer.write_batch
+    else:
+        writer = pa.ipc.new_stream(sink, SCHEMA)
+        write = writer.write_batch
+    try:
+        for batch in batches:
+            write(batch)  # в Parquet каждая пачка - отдельная row group
+            chunk = sink.drain()
+            if chunk:
+                yield chunk
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def read_batches(source: BinaryIO, batch_rows: int | None = None) -> Iterator[pa.RecordBatch]:
+    """Parquet, Arrow IPC stream или Arrow IPC file - формат определяется по первым байтам"""
+    batch_rows = batch_rows or settings.COLUMNAR_BATCH_ROWS
+    head = source.read(6)
+    source.seek(0)
+    try:
+        if head[:4] == b"PAR1":
+            yield from pq.ParquetFile(source).iter_batches(batch_size=batch_rows)
+        elif head == b"ARROW1":
+            reader = pa.ipc.open_file(source)
+            for index in range(reader.num_record_batches):
+                yield reader.get_batch(index)
+        elif head[:4] == b"\xff\xff\xff\xff":
+            yield from pa.ipc.open_stream(source)
+        else:
+            raise ColumnarError("Ожидается файл Parquet или Arrow IPC")
+    except pa.ArrowException as e:
+        raise ColumnarError(f"Не удалось прочитать файл: {e}") from e
+
+
+def spool(source: BinaryIO) -> str:
+    """Сохраняет загруженный файл для задачи импорта, возвращает путь"""
+    directory = settings.COLUMNAR_IMPORT_DIR or tempfile.gettempdir()
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"tournaments-import-{uuid.uuid4().hex}")
+    with open(path, "wb") as target:
+        shutil.copyfileobj(source, target, 1024 * 1024)
+    return path
+
+
+def _conform(batch: pa.RecordBatch) -> pa.Table:
+    """Оставляет известные колонки и приводит их к типам SCHEMA (int32 -> int64, naive -> UTC и т.п.)"""
+    names = set(batch.schema.names)
+    missing = [name for name in REQUIRED_COLUMNS if name not in names]
+    if missing:
+        raise ColumnarError(f"Нет обязательных колонок: {', '.join(missing)}")
+    arrays, fields = [], []
+    for name in IMPORT_COLUMNS:
+        if name not in names:
+            continue
+        field = SCHEMA.field(name)
+        try:
+            arrays.append(batch.column(name).cast(field.type))
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError) as e:
+            raise ColumnarError(f"Колонка {name}: нельзя привести к {field.type}") from e
+        if name in INT32_COLUMNS:
+            bounds = pc.min_max(arrays[-1])
+            low, high = bounds["min"].as_py(), bounds["max"].as_py()
+            if (low is not None and low < INT32_MIN) or (high is not None and high > INT32_MAX):
+                raise ColumnarError(f"Колонка {name}: значение вне диапазона INTEGER")
+        fields.append(field)
+    return pa.Table.from_arrays(arrays, schema=pa.schema(fields))
+
+
+def import_batches(
+    session: Session,
+    user_id: uuid.UUID,
+    batches: Iterable[pa.RecordBatch],
+    progress: ImportProgress,
+    on_batch: Callable[[ImportProgress], None] | None = None,
+) -> ImportProgress:
+    """
+    Добавляет турниры игроку, коммит на каждую пачку - при ошибке в середине файла
+    уже загруженное остаётся и отражено в progress.
+    Строки с id, который уже есть у этого игрока, пропускаются - повторный импорт своего экспорта
+    ничего не дублирует. Если id занят другим игроком, турнир сохраняется с новым id.
+    """
+    for batch in batches:
+        if progress.imported + progress.skipped + batch.num_rows > settings.COLUMNAR_IMPORT_MAX_ROWS:
+            raise ColumnarError(f"Больше {settings.COLUMNAR_IMPORT_MAX_ROWS} строк за один импорт")
+        rows = _conform(batch).to_pylist()
+
+        ids: list[uuid.UUID | None] = []
+        for row in rows:
+            try:
+                ids.append(uuid.UUID(row["id"]) if row.get("id") else None)
+            except ValueError as e:
+                raise ColumnarError(f"Некорректный id: {row['id']!r}") from e
+        known, taken = set(), set()
+        requested = {tourney_id for tourney_id in ids if tourney_id is not None}
+        if requested:
+            for tourney_id, owner_id in session.exec(
+                select(Torney.id, Torney.user_id).where(Torney.id.in_(requested))
+            ).all():
+                (known if owner_id == user_id else taken).add(tourney_id)
+
+        imported, months = 0, set()
+        for row, tourney_id in zip(rows, ids):
+            if tourney_id in known:
+                progress.skipped += 1
+                continue
+            if tourney_id in taken:
+                # Такой id у другого игрока (например, загружают чужой экспорт) - строка получает новый
+                tourney_id = None
+            name = row.get("name")
+            if not name or len(name) > 255:
+                raise ColumnarError(f"Некорректное название турнира: {name!r}")
+            values = {key: value for key, value in row.items() if key != "id" and value is not None}
+            if "play_date" in values:
+                try:
+                    values["play_date"] = normalize_play_date(values["play_date"])
+                except ValueError as e:
+                    raise ColumnarError(str(e)) from e
+            tournament = Torney(
+                **values,
+                user_id=user_id,
+                series_id=crud.get_or_create_series(session=session, name=name, buy_in=row.get("buy_in")),
+            )
+            if tourney_id is not None:
+                tournament.id = tourney_id
+                known.add(tourney_id)  # повтор внутри файла
+            session.add(tournament)
+            months.add(tourney_moment(tournament).replace(day=1, hour=0, minute=0, second=0, microsecond=0))
+            imported += 1
+        session.commit()
+        progress.imported += imported
+        progress.months |= months
+        if on_batch:
+            on_batch(progress)
+    return progress
@@ -17,14 +17,92 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 11520  # 8 дней
     REFRESH_TOKEN_EXPIRE_DAYS: int = 30
+    REVOCATION_SYNC_INTERVAL_SECONDS: float = 5.0  # как быстро отзыв доходит до других воркеров
     
+    # Server Settings (python -m app.server)
+    SERVER_HOST: str = "0.0.0.0"
+    SERVER_PORT: int = 8000
+    WEB_CONCURRENCY: int = 0  # воркеров uvicorn, 0 - по числу доступных ядер в пределах бюджета соединений
+    THREADPOOL_SIZE: int = 40  # потоков AnyIO для синхронных роутов на воркер
+    KEEP_ALIVE_TIMEOUT_SECONDS: int = 5
+    GRACEFUL_TIMEOUT_SECONDS: int = 30
+    FORWARDED_ALLOW_IPS: str = "127.0.0.1"
+
     # Database Settings
     POSTGRES_SERVER: str
     POSTGRES_PORT: int = 5432
     POSTGRES_USER: str
     POSTGRES_PASSWORD: str
     POSTGRES_DB: str
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_PRE_PING: bool = False
+    DB_POOL_WARM_CONNECTIONS: int = 1  # соединений, открываемых при старте воркера
+    POSTGRES_MAX_CONNECTIONS: int = 100
+    DB_RESERVED_CONNECTIONS: int = 10  # миграции, админка, бэкапы
+    # В проде false: схема создаётся миграциями (alembic upgrade head), а не на старте
+    DB_CREATE_TABLES_ON_STARTUP: bool = True
     
+    # Leaderboard Settings
+    LEADERBOARD_CACHE_TTL_SECONDS: int = 60
+    LEADERBOARD_ROI_MIN_TOURNAMENTS: int = 20
+
+    # Stats Snapshot Settings
+    STATS_SNAPSHOT_MAX_BYTES: int = 64 * 1024 * 1024  # на процесс; дальше вытесняются давние игроки
+    STATS_SNAPSHOT_TTL_SECONDS: int = 30  # изменения из других воркеров видны не позже
+
+    # Live Events Settings (SSE)
+    EVENTS_ENABLED: bool = True
+    EVENTS_MAX_CONNECTIONS_PER_USER: int = 5  # на воркер
+    EVENTS_QUEUE_SIZE: int = 100  # непрочитанных сообщений на подключение, дальше - resync
+    EVENTS_HEARTBEAT_SECONDS: float = 15.0
+    EVENTS_TOKEN_EXPIRE_SECONDS: int = 60  # токен в URL стрима: только на подключение
+
+    # Columnar Export/Import Settings (Arrow, Parquet)
+    COLUMNAR_BATCH_ROWS: int = 10_000
+    COLUMNAR_IMPORT_MAX_ROWS: int = 1_000_000
+    # Загруженные файлы ждут задачу импорта здесь; пусто - системный temp.
+    # Если воркеры задач на нескольких нодах - общий для них каталог
+    COLUMNAR_IMPORT_DIR: str = ""
+
+    # Search Settings
+    SEARCH_SIMILARITY_THRESHOLD: float = 0.4  # pg_trgm word_similarity, 0..1
+
+    # Simulation Settings
+    SIMULATION_WORKERS: int = 2
+    SIMULATION_MIN_SAMPLE: int = 30
+    SIMULATION_MAX_PATHS: int = 100_000
+    SIMULATION_MAX_HORIZON: int = 10_000
+    SIMULATION_MAX_STEPS: int = 50_000_000  # paths * horizon
+    SIMULATION_CHUNK_STEPS: int = 1_000_000
+    SIMULATION_TIME_BUDGET_SECONDS: float = 5.0
+
+    # Background Job Settings
+    JOB_WORKERS: int = 1  # процессов на каждый воркер приложения, 0 - не запускать
+    JOB_POLL_INTERVAL_SECONDS: float = 2.0
+    JOB_LEASE_SECONDS: int = 300  # без прогресса дольше - задача считается брошенной
+    JOB_RETRY_BASE_SECONDS: int = 5
+    JOB_RETRY_MAX_SECONDS: int = 600
+    JOB_SHUTDOWN_TIMEOUT_SECONDS: float = 10.0
+    JOB_DB_POOL_SIZE: int = 2  # соединений на процесс-воркер задач
+
+    # Rate Limit Settings
+    # "METHOD /path" (или префикс с *) -> лимиты "ключ:кол-во/период", ключ: ip | user | email
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMITS: dict[str, list[str]] = {
+        "POST /v1/auth/login": ["ip:20/minute", "email:5/minute"],
+        "POST /v1/auth/login/form": ["ip:20/minute", "email:5/minute"],
+        "POST /v1/auth/register": ["ip:5/minute"],
+        "POST /v1/auth/refresh-token": ["ip:30/minute"],
+        "POST /v1/tournaments/": ["user:120/minute"],
+        "PUT /v1/tournaments/*": ["user:120/minute"],
+        "DELETE /v1/tournaments/*": ["user:120/minute"],
+        "POST /v1/jobs/": ["user:10/minute"],
+        "GET /v1/tournaments/export": ["user:10/minute"],
+        "POST /v1/tournaments/import": ["user:5/minute"],
+        "POST /v1/analytics/risk-of-ruin": ["user:10/minute"],
+    }
+
     # Optional Settings
     SENTRY_DSN: HttpUrl | None = None
 
@@ -1,13 +1,37 @@
-from sqlmodel import Session, SQLModel, create_engine, select
-import os
-# from app import crud
-# from app.core.config import settings
-# from app.models import User, UserCreate
+from functools import lru_cache
+
+from sqlalchemy import Engine, text
+from sqlmodel import Session, SQLModel, create_engine
+
 from app.core.config import settings
-from dotenv import load_dotenv
 
-load_dotenv()
-engine = create_engine(str(settings.SQLALCHEMY_DATABASE_URI))
+
+@lru_cache
+def get_engine() -> Engine:
+    # Движок создаётся при первом обращении, а не при импорте модуля:
+    # импорт ничего не открывает, а в дочерних процессах движок свой
+    return create_engine(
+        str(settings.SQLALCHEMY_DATABASE_URI),
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+    )
+
+
+def warm_pool(connections: int) -> int:
+    """Заранее открывает соединения, чтобы первые запросы не платили за подключение"""
+    opened = []
+    try:
+        for _ in range(connections):
+            connection = get_engine().connect()
+            opened.append(connection)
+            connection.execute(text("SELECT 1"))
+    finally:
+        for connection in opened:
+            connection.close()
+    return len(opened)
+
+
 def init_db(session: Session) -> None:
     print('init db')
     # Tables should be created with Alembic migrations
@@ -16,4 +40,4 @@ def init_db(session: Session) -> None:
     # from sqlmodel import SQLModel
 
     # This works because the models are already imported and registered from app.models
-    SQLModel.metadata.create_all(engine)
+    SQLModel.metadata.create_all(get_engine())
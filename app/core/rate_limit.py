@@ -0,0 +1,126 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Protocol
+
+# Token bucket: в ведре до capacity токенов, они доливаются со скоростью
+# capacity / per_seconds, каждый запрос забирает один токен.
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+KEY_KINDS = ("ip", "user", "email")
+
+BucketState = tuple[float, float]  # (токены, время последнего обновления)
+
+
+@dataclass(frozen=True)
+class Limit:
+    key: str
+    capacity: int
+    per_seconds: float
+
+    @property
+    def rate(self) -> float:
+        return self.capacity / self.per_seconds
+
+
+def parse_limit(spec: str) -> Limit:
+    """'email:5/minute' -> Limit(key='email', capacity=5, per_seconds=60)"""
+    key, _, amount = spec.partition(":")
+    count, _, period = amount.partition("/")
+    if key not in KEY_KINDS or period not in PERIODS or not count.isdigit() or int(count) <= 0:
+        raise ValueError(f"Invalid rate limit: {spec!r}")
+    return Limit(key=key, capacity=int(count), per_seconds=PERIODS[period])
+
+
+def take_token(state: BucketState | None, now: float, limit: Limit) -> tuple[BucketState, bool, float]:
+    """Возвращает новое состояние ведра, разрешён ли запрос и через сколько секунд повторить"""
+    if state is None:
+        tokens = float(limit.capacity)
+    else:
+        tokens, updated_at = state
+        tokens = min(float(limit.capacity), tokens + max(now - updated_at, 0) * limit.rate)
+    if tokens >= 1:
+        return (tokens - 1, now), True, 0.0
+    return (tokens, now), False, (1 - tokens) / limit.rate
+
+
+class RateLimitBackend(Protocol):
+    async def hit(self, key: str, limit: Limit) -> tuple[bool, float]: ...
+
+
+class InMemoryBackend:
+    """Вёдра в памяти процесса: O(1) на запрос, самые давние вёдра вытесняются после max_keys"""
+
+    def __init__(self, max_keys: int = 100_000) -> None:
+        self._max_keys = max_keys
+        self._buckets: OrderedDict[str, BucketState] = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def hit(self, key: str, limit: Limit) -> tuple[bool, float]:
+        now = time.monotonic()
+        with self._lock:
+            state = self._buckets.get(key)
+            if state is not None:
+                self._buckets.move_to_end(key)
+            state, allowed, retry_after = take_token(state, now, limit)
+            self._buckets[key] = state
+            if len(self._buckets) > self._max_keys:
+                self._buckets.popitem(last=False)
+        return allowed, retry_after
+
+
+class BucketStore(Protocol):
+    """
+    Общее для всех воркеров хранилище (Redis, memcached и т.п.).
+    compare_and_set атомарно записывает new, только если сейчас там expected.
+    """
+
+    async def get(self, key: str) -> BucketState | None: ...
+
+    async def compare_and_set(
+        self, key: str, expected: BucketState | None, new: BucketState, ttl_seconds: float
+    ) -> bool: ...
+
+
+class SharedStoreBackend:
+    """Token bucket поверх общего хранилища: оптимистичное обновление через compare-and-set"""
+
+    def __init__(self, store: BucketStore, max_retries: int = 5) -> None:
+        self._store = store
+        self._max_retries = max_retries
+
+    async def hit(self, key: str, limit: Limit) -> tuple[bool, float]:
+        for _ in range(self._max_retries):
+            # Время стенное, а не monotonic: ведро общее для разных машин
+            now = time.time()
+            current = await self._store.get(key)
+            state, allowed, retry_after = take_token(current, now, limit)
+            if await self._store.compare_and_set(key, current, state, ttl_seconds=limit.per_seconds):
+                return allowed, retry_after
+        # Ключ слишком горячий и CAS всё время проигрывает - не блокируем запрос
+        return True, 0.0
+
+
+class LocalBucketStore:
+    """Реализация BucketStore в памяти процесса - для разработки и тестов"""
+
+    def __init__(self) -> None:
+        self._data: dict[str, tuple[BucketState, float]] = {}
+        self._lock = asyncio.Lock()
+
+    async def get(self, key: str) -> BucketState | None:
+        item = self._data.get(key)
+        if item is None or item[1] < time.time():
+            return None
+        return item[0]
+
+    async def compare_and_set(
+        self, key: str, expected: BucketState | None, new: BucketState, ttl_seconds: float
+    ) -> bool:
+        async with self._lock:
+            if await self.get(key) != expected:
+                return False
+            self._data[key] = (new, time.time() + ttl_seconds)
+            return True
@@ -0,0 +1,96 @@
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete
+from sqlmodel import Session, select
+
+from app.core.db import get_engine
+from app.models import RevokedToken
+
+logger = logging.getLogger(__name__)
+
+
+class RevocationStore:
+    """
+    Отозванные jti в памяти процесса. Проверка на каждом запросе - поиск в dict,
+    без обращения к БД. Источник истины - таблица revoked_token: фоновый поток
+    подтягивает из неё отзывы других воркеров и выбрасывает истёкшие.
+    """
+
+    # Перекрытие окна синхронизации: транзакции другого воркера могут закоммититься позже
+    SYNC_OVERLAP = timedelta(seconds=60)
+    PRUNE_INTERVAL = 3600
+
+    def __init__(self) -> None:
+        self._revoked: dict[str, float] = {}  # jti -> exp (unix time)
+        self._synced_until: datetime | None = None
+        self._pruned_at: float | None = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def __len__(self) -> int:
+        return len(self._revoked)
+
+    def is_revoked(self, jti: str | None) -> bool:
+        return jti is not None and jti in self._revoked
+
+    def add(self, jti: str, expires_at: float) -> None:
+        with self._lock:
+            self._revoked[jti] = expires_at
+
+    def sync(self) -> None:
+        now = datetime.now(timezone.utc)
+        statement = select(RevokedToken.jti, RevokedToken.expires_at, RevokedToken.revoked_at).where(
+            RevokedToken.expires_at > now
+        )
+        if self._synced_until is not None:
+            statement = statement.where(RevokedToken.revoked_at >= self._synced_until - self.SYNC_OVERLAP)
+        with Session(get_engine()) as session:
+            rows = session.exec(statement).all()
+            if self._pruned_at is None or time.monotonic() - self._pruned_at > self.PRUNE_INTERVAL:
+                session.exec(delete(RevokedToken).where(RevokedToken.expires_at <= now))
+                session.commit()
+                self._pruned_at = time.monotonic()
+
+        cutoff = now.timestamp()
+        with self._lock:
+            for jti, expires_at, revoked_at in rows:
+                self._revoked[jti] = _timestamp(expires_at)
+                if self._synced_until is None or revoked_at.replace(tzinfo=timezone.utc) > self._synced_until:
+                    self._synced_until = revoked_at.replace(tzinfo=timezone.utc)
+            if self._synced_until is None:
+                self._synced_until = now
+            for jti in [jti for jti, expires_at in self._revoked.items() if expires_at <= cutoff]:
+                del self._revoked[jti]
+
+    def start(self, interval: float) -> None:
+        self.sync()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(interval,), name="revocation-sync", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self, interval: float) -> None:
+        while not self._stop.wait(interval):
+            try:
+                self.sync()
+            except Exception:
+                logger.exception("Revoked tokens sync failed")
+
+
+def _timestamp(moment: datetime) -> float:
+    # В БД время хранится без зоны, но в UTC
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp()
+
+
+revocations = RevocationStore()
@@ -1,3 +1,4 @@
+import uuid
 from datetime import datetime, timedelta, timezone
 from typing import Any
 
@@ -8,6 +9,7 @@ from passlib.context import CryptContext
 from pydantic import ValidationError
 
 from app.core.config import settings
+from app.core.revocation import revocations
 from app.models import TokenPayload
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -21,7 +23,7 @@ reusable_oauth2 = OAuth2PasswordBearer(
 
 def create_access_token(subject: str | Any, expires_delta: timedelta) -> str:
     expire = datetime.now(timezone.utc) + expires_delta
-    to_encode = {"exp": expire, "sub": str(subject)}
+    to_encode = {"exp": expire, "sub": str(subject), "jti": uuid.uuid4().hex, "type": "access"}
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
@@ -35,18 +37,39 @@ def get_password_hash(password: str) -> str:
 
 def create_refresh_token(subject: str | Any, expires_delta: timedelta) -> str:
     expire = datetime.now(timezone.utc) + expires_delta
-    to_encode = {"exp": expire, "sub": str(subject)}
+    to_encode = {"exp": expire, "sub": str(subject), "jti": uuid.uuid4().hex, "type": "refresh"}
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-def verify_refresh_token(token: str) -> str | None:
+def create_stream_token(subject: str | Any, expires_delta: timedelta) -> str:
+    """Короткий токен только для GET /events/stream: EventSource в браузере не умеет заголовки"""
+    expire = datetime.now(timezone.utc) + expires_delta
+    to_encode = {"exp": expire, "sub": str(subject), "jti": uuid.uuid4().hex, "type": "stream"}
+    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=ALGORITHM)
+    return encoded_jwt
+
+def verify_stream_token(token: str) -> TokenPayload | None:
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
-        return payload['sub']
+        token_data = TokenPayload(**payload)
+    except (jwt.InvalidTokenError, ValidationError):
+        return None
+    if token_data.type != "stream" or revocations.is_revoked(token_data.jti):
+        return None
+    return token_data
+
+def verify_refresh_token(token: str) -> TokenPayload | None:
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
+        token_data = TokenPayload(**payload)
     except jwt.ExpiredSignatureError:
         return None
-    except jwt.InvalidTokenError:
+    except (jwt.InvalidTokenError, ValidationError):
+        return None
+    # Токены без type выданы до ротации - принимаем, пока не истекут
+    if token_data.type not in (None, "refresh") or revocations.is_revoked(token_data.jti):
         return None
+    return token_data
 
 def verify_token(token: str) -> TokenPayload | None:
     try:
@@ -54,6 +77,9 @@ def verify_token(token: str) -> TokenPayload | None:
         token_data = TokenPayload(**payload)
     except (jwt.InvalidTokenError, ValidationError):
         return None
+    # Refresh- и stream-токены не годятся как access; отзыв проверяется в памяти, без БД
+    if token_data.type in ("refresh", "stream") or revocations.is_revoked(token_data.jti):
+        return None
     return token_data
 
 def get_current_user_id(token: str = Depends(reusable_oauth2)) -> str:
@@ -0,0 +1,35 @@
+import logging
+import time
+from contextlib import contextmanager
+
+# uvicorn настраивает свой логгер, поэтому отчёт о старте пишем в него
+logger = logging.getLogger("uvicorn.error")
+
+
+class StartupTimer:
+    """Время старта воркера по фазам: импорты, схема, пул соединений и т.д."""
+
+    def __init__(self, started_at: float | None = None) -> None:
+        self.started_at = started_at if started_at is not None else time.perf_counter()
+        self.phases: dict[str, float] = {}
+        self._mark = self.started_at
+
+    def lap(self, name: str) -> None:
+        """Закрывает фазу, которая шла с прошлой отметки (например, импорты модуля)"""
+        now = time.perf_counter()
+        self.phases[name] = (now - self._mark) * 1000
+        self._mark = now
+
+    @contextmanager
+    def phase(self, name: str):
+        self._mark = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.lap(name)
+
+    def report(self) -> dict[str, float]:
+        total = (time.perf_counter() - self.started_at) * 1000
+        summary = ", ".join(f"{name} {ms:.0f}ms" for name, ms in self.phases.items())
+        logger.info("Startup finished in %.0fms (%s)", total, summary)
+        return {**{name: round(ms, 1) for name, ms in self.phases.items()}, "total": round(total, 1)}
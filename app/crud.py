@@ -1,14 +1,14 @@
 import uuid
+from datetime import datetime, timezone
 from typing import Union
 
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
 from sqlmodel import Session, select
-from passlib.context import CryptContext
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-from app.models import User, UserCreate, UserRegister
-
-def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+from app.core.revocation import revocations
+from app.core.security import get_password_hash
+from app.models import RevokedToken, TokenPayload, TournamentSeries, User, UserCreate, UserRegister
 
 def create_user(*, session: Session, user_create: Union[UserCreate, UserRegister]) -> User:
     db_obj = User.model_validate(
@@ -27,4 +27,56 @@ def get_user_by_email(*, session: Session, email: str) -> User | None:
 def get_user_by_id(*, session: Session, user_id: str) -> User | None:
     statement = select(User).where(User.id == uuid.UUID(user_id))
     session_user = session.exec(statement).first()
-    return session_user
\ No newline at end of file
+    return session_user
+
+def revoke_token(*, session: Session, token_data: TokenPayload) -> bool:
+    """
+    Отзывает токен по jti. Возвращает False, если он уже был отозван -
+    вставка по первичному ключу атомарна, поэтому один refresh-токен можно обменять только один раз.
+    """
+    expires_at = datetime.fromtimestamp(token_data.exp, timezone.utc)
+    session.add(RevokedToken(jti=token_data.jti, user_id=uuid.UUID(token_data.sub), expires_at=expires_at))
+    try:
+        session.commit()
+    except IntegrityError:
+        session.rollback()
+        return False
+    revocations.add(token_data.jti, token_data.exp)
+    return True
+
+# (name_key, site, buy_in) -> id серии; серии не удаляются, поэтому кэш не устаревает
+_series_ids: dict[tuple[str, str, int], int] = {}
+SERIES_CACHE_SIZE = 50_000
+
+def series_key(name: str, buy_in: int | None, site: str = "") -> tuple[str, str, int]:
+    return " ".join(name.split()).lower(), site, buy_in or 0
+
+def get_or_create_series(*, session: Session, name: str, buy_in: int | None, site: str = "") -> int:
+    """Id серии для турнира; серия создаётся при первом появлении"""
+    key = series_key(name, buy_in, site)
+    series_id = _series_ids.get(key)
+    if series_id is not None:
+        return series_id
+
+    name_key, site, buy_in = key
+    lookup = select(TournamentSeries.id).where(
+        TournamentSeries.name_key == name_key,
+        TournamentSeries.site == site,
+        TournamentSeries.buy_in == buy_in,
+    )
+    series_id = session.exec(lookup).first()
+    if series_id is not None:
+        # Кэшируем только уже закоммиченные серии: новая может откатиться вместе с турниром
+        if len(_series_ids) >= SERIES_CACHE_SIZE:
+            _series_ids.clear()
+        _series_ids[key] = series_id
+    else:
+        values = {"name": " ".join(name.split()), "name_key": name_key, "site": site, "buy_in": buy_in}
+        if session.get_bind().dialect.name == "postgresql":
+            # Два воркера могут создавать одну серию одновременно - побеждает первый
+            session.exec(pg_insert(TournamentSeries).values(**values).on_conflict_do_nothing())
+        else:
+            session.add(TournamentSeries(**values))
+            session.flush()
+        series_id = session.exec(lookup).one()
+    return series_id
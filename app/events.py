@@ -0,0 +1,229 @@
+import asyncio
+import json
+import logging
+import select
+import threading
+import uuid
+from datetime import date
+from typing import Any
+
+import psycopg2
+from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+from sqlalchemy import func
+from sqlmodel import Session
+from sqlmodel import select as sql_select
+
+from app.core.config import settings
+from app.core.db import get_engine
+from app.snapshots import snapshots
+
+logger = logging.getLogger(__name__)
+
+# Живые обновления для клиентов игрока (SSE).
+# Роут после коммита делает NOTIFY в канал Postgres, в каждом воркере поток NotifyListener
+# слушает канал и передаёт событие в EventHub, а тот раскладывает его по очередям
+# подключённых клиентов этого игрока. Без Postgres (SQLite) события доставляются только
+# внутри своего процесса.
+
+CHANNEL = "tourney_events"
+# Метка процесса: свои события не сбрасывают свой же снимок статистики
+ORIGIN = uuid.uuid4().hex
+
+RESYNC = "event: resync\ndata: {}\n\n"
+HEARTBEAT = ": ping\n\n"
+
+
+def format_event(event: str, data: dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str, separators=(',', ':'))}\n\n"
+
+
+class TooManyConnections(Exception):
+    pass
+
+
+class Subscription:
+    """Одно подключение клиента: ограниченная очередь готовых SSE-сообщений"""
+
+    def __init__(self, user_id: str, queue_size: int) -> None:
+        self.user_id = user_id
+        self.queue: asyncio.Queue[str | None] = asyncio.Queue(maxsize=queue_size)
+
+    def push(self, message: str | None) -> None:
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # Клиент не успевает читать: копить дальше не будем, пусть перечитает состояние целиком
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC if message is not None else None)
+
+
+class EventHub:
+    """Подписки процесса по игрокам. Все методы, кроме *_threadsafe, вызываются из event loop"""
+
+    def __init__(self, max_per_user: int, queue_size: int) -> None:
+        self._max_per_user = max_per_user
+        self._queue_size = queue_size
+        self._subscriptions: dict[str, set[Subscription]] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def bind(self, loop: asyncio.AbstractEventLoop) -> None:
+        self._loop = loop
+
+    def connections(self, user_id: str | None = None) -> int:
+        if user_id is not None:
+            return len(self._subscriptions.get(user_id, ()))
+        return sum(len(subscriptions) for subscriptions in self._subscriptions.values())
+
+    def subscribe(self, user_id: str) -> Subscription:
+        subscriptions = self._subscriptions.setdefault(user_id, set())
+        if len(subscriptions) >= self._max_per_user:
+            raise TooManyConnections(user_id)
+        subscription = Subscription(user_id, self._queue_size)
+        subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscriptions = self._subscriptions.get(subscription.user_id)
+        if subscriptions is None:
+            return
+        subscriptions.discard(subscription)
+        if not subscriptions:
+            del self._subscriptions[subscription.user_id]
+
+    def dispatch(self, user_id: str, message: str) -> None:
+        for subscription in self._subscriptions.get(user_id, ()):
+            subscription.push(message)
+
+    def broadcast(self, message: str | None) -> None:
+        for subscriptions in self._subscriptions.values():
+            for subscription in subscriptions:
+                subscription.push(message)
+
+    def dispatch_threadsafe(self, user_id: str, message: str) -> None:
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self.dispatch, user_id, message)
+
+    def broadcast_threadsafe(self, message: str | None) -> None:
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self.broadcast, message)
+
+    def close(self) -> None:
+        # None в очереди - сигнал потоку ответа завершиться
+        self.broadcast(None)
+
+
+hub = EventHub(
+    max_per_user=settings.EVENTS_MAX_CONNECTIONS_PER_USER,
+    queue_size=settings.EVENTS_QUEUE_SIZE,
+)
+
+
+class NotifyListener:
+    """
+    Поток с отдельным соединением (не из пула), которое держит LISTEN.
+    После переподключения клиенты получают resync: события за время разрыва потеряны.
+    """
+
+    POLL_SECONDS = 1.0
+    RECONNECT_SECONDS = 2.0
+
+    def __init__(self, target: EventHub) -> None:
+        self._hub = target
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="events-listener", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self) -> None:
+        reconnect = False
+        while not self._stop.is_set():
+            try:
+                self._listen(reconnect)
+            except Exception:
+                logger.exception("Events listener lost connection")
+            reconnect = True
+            self._stop.wait(self.RECONNECT_SECONDS)
+
+    def _listen(self, reconnect: bool) -> None:
+        url = get_engine().url
+        connection = psycopg2.connect(**url.translate_connect_args(username="user", database="dbname"))
+        try:
+            connection.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+            with connection.cursor() as cursor:
+                cursor.execute(f"LISTEN {CHANNEL}")
+            if reconnect:
+                self._hub.broadcast_threadsafe(RESYNC)
+            while not self._stop.is_set():
+                if select.select([connection], [], [], self.POLL_SECONDS) == ([], [], []):
+                    continue
+                connection.poll()
+                while connection.notifies:
+                    self._deliver(connection.notifies.pop(0).payload)
+        finally:
+            connection.close()
+
+    def _deliver(self, payload: str) -> None:
+        try:
+            message = json.loads(payload)
+            user_id = message["user_id"]
+        except (ValueError, KeyError):
+            logger.warning("Malformed event payload: %r", payload[:200])
+            return
+        if message.get("origin") != ORIGIN:
+            # Турниры изменил другой воркер - наш снимок статистики устарел
+            snapshots.invalidate(uuid.UUID(user_id))
+        self._hub.dispatch_threadsafe(user_id, format_event(message["event"], message["data"]))
+
+
+listener = NotifyListener(hub)
+
+
+def publish(session: Session, user_id: uuid.UUID, event: str, data: dict[str, Any]) -> None:
+    """
+    Отправляет событие всем клиентам игрока во всех воркерах. Вызывать после коммита.
+    NOTIFY уходит отдельным соединением: коммит сессии роута истёк бы её объекты
+    и стоил бы лишнего SELECT при сериализации ответа.
+    """
+    if not settings.EVENTS_ENABLED:
+        return
+    engine = session.get_bind()
+    if engine.dialect.name != "postgresql":
+        hub.dispatch_threadsafe(str(user_id), format_event(event, data))
+        return
+    payload = json.dumps(
+        {"origin": ORIGIN, "user_id": str(user_id), "event": event, "data": data},
+        default=str,
+        separators=(",", ":"),
+    )
+    with engine.begin() as connection:
+        connection.execute(sql_select(func.pg_notify(CHANNEL, payload)))
+
+
+def publish_tournament(
+    session: Session, user_id: uuid.UUID, action: str, tournament: dict[str, Any], day: date
+) -> None:
+    """
+    tournament.created / updated / deleted. Итоги игровой сессии (дня турнира) в поле session -
+    если снимок статистики игрока уже в памяти или у игрока есть подключения к этому воркеру;
+    ради события без слушателей полную историю из БД не читаем.
+    """
+    if not settings.EVENTS_ENABLED:
+        return
+    data: dict[str, Any] = {"tournament": tournament}
+    totals = snapshots.cached_summary(user_id, day, day)
+    if totals is None and hub.connections(str(user_id)):
+        totals = snapshots.summary(session, user_id, day, day)
+    if totals is not None:
+        totals.pop("days")
+        data["session"] = {"day": day, **totals}
+    publish(session, user_id, f"tournament.{action}", data)
@@ -0,0 +1,344 @@
+import logging
+import multiprocessing
+import os
+import random
+import signal
+import socket
+import threading
+import time
+import uuid
+from collections.abc import Callable
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy import and_, or_, update
+from sqlmodel import Session, select
+
+from app import events, leaderboard
+from app.core.config import settings
+from app.core.db import get_engine
+from app.models import Job
+
+logger = logging.getLogger(__name__)
+
+# Фоновые задачи без внешнего брокера: очередь - таблица job в Postgres.
+# Воркеры (отдельные процессы) забирают задачи через SELECT ... FOR UPDATE SKIP LOCKED,
+# поэтому их можно запускать на любом количестве нод.
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+class LeaseLost(Exception):
+    """Задачу забрал другой воркер (аренда истекла) - результат этого воркера не нужен"""
+
+
+class JobContext:
+    """То, что получает обработчик: данные задачи и способ сообщить о прогрессе"""
+
+    # Прогресс пишется в БД не чаще, чем раз в столько секунд
+    PROGRESS_INTERVAL = 1.0
+
+    def __init__(
+        self, job_id: uuid.UUID, kind: str, user_id: uuid.UUID | None, payload: dict[str, Any], worker: str
+    ) -> None:
+        self.job_id = job_id
+        self.kind = kind
+        self.user_id = user_id
+        self.payload = payload
+        self.worker = worker
+        self._reported_at = 0.0
+        # Прогресс и продление аренды пишутся по одному: у процесса-воркера маленький пул
+        self._write_lock = threading.Lock()
+        self.lease_lost = False
+
+    def _renew(self, **values: Any) -> None:
+        with self._write_lock:
+            if not _update_job(self.job_id, worker=self.worker, locked_at=datetime.now(timezone.utc), **values):
+                self.lease_lost = True
+
+    def progress(self, fraction: float, message: str | None = None) -> None:
+        if self.lease_lost:
+            raise LeaseLost(self.job_id)
+        now = time.monotonic()
+        if now - self._reported_at < self.PROGRESS_INTERVAL and fraction < 1:
+            return
+        self._reported_at = now
+        # Заодно продлеваем аренду, чтобы долгую задачу не забрал другой воркер
+        self._renew(progress=max(0.0, min(fraction, 1.0)), message=message)
+        if self.lease_lost:
+            raise LeaseLost(self.job_id)
+
+
+class LeaseHeartbeat:
+    """
+    Продлевает аренду, пока работает обработчик: долгий шаг без прогресса
+    (один большой запрос, как в rebuild_all) не должен отдать задачу второму воркеру.
+    """
+
+    def __init__(self, context: JobContext) -> None:
+        self._context = context
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"job-lease-{context.job_id}", daemon=True)
+
+    def __enter__(self) -> "LeaseHeartbeat":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        interval = settings.JOB_LEASE_SECONDS / 3
+        while not self._stop.wait(interval) and not self._context.lease_lost:
+            try:
+                self._context._renew()
+            except Exception:
+                logger.exception("Job %s lease renewal failed", self._context.job_id)
+
+
+JobHandler = Callable[[Session, JobContext], dict[str, Any] | None]
+HANDLERS: dict[str, JobHandler] = {}
+# Задачи, которые пользователь может поставить сам через API
+USER_JOB_KINDS: set[str] = set()
+
+
+def register(kind: str, user_facing: bool = False) -> Callable[[JobHandler], JobHandler]:
+    def decorator(handler: JobHandler) -> JobHandler:
+        HANDLERS[kind] = handler
+        if user_facing:
+            USER_JOB_KINDS.add(kind)
+        return handler
+    return decorator
+
+
+def enqueue(
+    session: Session,
+    kind: str,
+    payload: dict[str, Any] | None = None,
+    user_id: uuid.UUID | None = None,
+    max_attempts: int = 3,
+) -> Job:
+    job = Job(kind=kind, payload=payload or {}, user_id=user_id, max_attempts=max_attempts)
+    session.add(job)
+    session.commit()
+    session.refresh(job)
+    return job
+
+
+def _update_job(job_id: uuid.UUID, worker: str | None = None, **values: Any) -> bool:
+    """worker - обновить, только если задача всё ещё за этим воркером"""
+    values["updated_at"] = datetime.now(timezone.utc)
+    statement = update(Job).where(Job.id == job_id)
+    if worker is not None:
+        statement = statement.where(Job.locked_by == worker)
+    with Session(get_engine()) as session:
+        updated = session.exec(statement.values(**values)).rowcount
+        session.commit()
+    return updated > 0
+
+
+def retry_delay(attempts: int) -> float:
+    """Экспоненциальная задержка с джиттером, чтобы повторы не шли пачкой"""
+    delay = min(settings.JOB_RETRY_MAX_SECONDS, settings.JOB_RETRY_BASE_SECONDS * 2 ** max(attempts - 1, 0))
+    return delay * random.uniform(0.5, 1.0)
+
+
+def claim_next(worker: str) -> JobContext | None:
+    """Забирает одну готовую задачу или задачу, брошенную упавшим воркером"""
+    now = datetime.now(timezone.utc)
+    stale = now - timedelta(seconds=settings.JOB_LEASE_SECONDS)
+    with Session(get_engine()) as session:
+        while True:
+            statement = (
+                select(Job)
+                .where(or_(
+                    and_(Job.status == QUEUED, Job.run_after <= now),
+                    and_(Job.status == RUNNING, Job.locked_at < stale),
+                ))
+                .order_by(Job.run_after)
+                .limit(1)
+                .with_for_update(skip_locked=True)
+            )
+            job = session.exec(statement).first()
+            if job is None:
+                return None
+
+            job.updated_at = now
+            if job.status == RUNNING and job.attempts >= job.max_attempts:
+                # Воркер упал на последней попытке - больше не пробуем
+                job.status = FAILED
+                job.error = job.error or "Воркер не завершил задачу"
+                job.locked_by = None
+                session.add(job)
+                session.commit()
+                continue
+
+            job.status = RUNNING
+            job.attempts += 1
+            job.locked_by = worker
+            job.locked_at = now
+            session.add(job)
+            session.commit()
+            return JobContext(job.id, job.kind, job.user_id, dict(job.payload or {}), worker)
+
+
+def run_job(context: JobContext) -> None:
+    handler = HANDLERS.get(context.kind)
+    try:
+        if handler is None:
+            raise LookupError(f"Неизвестный тип задачи: {context.kind}")
+        with LeaseHeartbeat(context), Session(get_engine()) as session:
+            result = handler(session, context)
+    except LeaseLost:
+        logger.warning("Job %s (%s) lease lost, dropping result", context.job_id, context.kind)
+        return
+    except Exception as e:
+        logger.exception("Job %s (%s) failed", context.job_id, context.kind)
+        with Session(get_engine()) as session:
+            job = session.get(Job, context.job_id, with_for_update=True)
+            if job is None or job.locked_by != context.worker:
+                return
+            retry = handler is not None and job.attempts < job.max_attempts
+            job.status = QUEUED if retry else FAILED
+            job.error = f"{type(e).__name__}: {e}"
+            job.locked_by = None
+            job.locked_at = None
+            job.updated_at = datetime.now(timezone.utc)
+            if retry:
+                job.run_after = job.updated_at + timedelta(seconds=retry_delay(job.attempts))
+            session.add(job)
+            session.commit()
+        return
+
+    finished = _update_job(
+        context.job_id,
+        worker=context.worker,
+        status=SUCCEEDED,
+        progress=1.0,
+        result=result,
+        error=None,
+        locked_by=None,
+        locked_at=None,
+    )
+    if not finished:
+        logger.warning("Job %s (%s) was taken over by another worker", context.job_id, context.kind)
+
+
+def run_worker(stop_event, worker: str) -> None:
+    """Цикл одного процесса-воркера: забрать задачу, выполнить, повторить"""
+    # Ctrl+C приходит всей группе процессов - останавливаемся только по stop_event
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # Своему процессу - свой маленький пул, он учтён в бюджете соединений app.server
+    settings.DB_POOL_SIZE = settings.JOB_DB_POOL_SIZE
+    settings.DB_MAX_OVERFLOW = 0
+    logger.info("Job worker %s started", worker)
+    while not stop_event.is_set():
+        try:
+            context = claim_next(worker)
+        except Exception:
+            logger.exception("Job worker %s could not claim a job", worker)
+            context = None
+        if context is None:
+            stop_event.wait(settings.JOB_POLL_INTERVAL_SECONDS)
+            continue
+        run_job(context)
+    logger.info("Job worker %s stopped", worker)
+
+
+class JobWorkers:
+    """Процессы-воркеры, которые живут вместе с приложением (запуск и остановка в lifespan)"""
+
+    def __init__(self, count: int) -> None:
+        self.count = count
+        self._context = multiprocessing.get_context("spawn")
+        self._stop = self._context.Event()
+        self._processes: list = []
+
+    def start(self) -> None:
+        prefix = f"{socket.gethostname()}:{os.getpid()}"
+        for index in range(self.count):
+            process = self._context.Process(
+                target=run_worker,
+                args=(self._stop, f"{prefix}:{index}"),
+                name=f"job-worker-{index}",
+                daemon=True,
+            )
+            process.start()
+            self._processes.append(process)
+
+    def stop(self, timeout: float | None = None) -> None:
+        self._stop.set()
+        deadline = time.monotonic() + (timeout if timeout is not None else settings.JOB_SHUTDOWN_TIMEOUT_SECONDS)
+        for process in self._processes:
+            process.join(max(deadline - time.monotonic(), 0))
+            if process.is_alive():
+                # Задача останется в running и будет подобрана после истечения аренды
+                process.terminate()
+                process.join()
+        self._processes.clear()
+
+
+# Обработчики
+
+@register("leaderboard_rebuild_user", user_facing=True)
+def _rebuild_user_leaderboard(session: Session, context: JobContext) -> dict[str, Any]:
+    periods = leaderboard.rebuild_user(
+        session,
+        context.user_id,
+        on_period=lambda done, total: context.progress(done / total, f"{done}/{total}"),
+    )
+    return {"periods": periods}
+
+
+@register("leaderboard_rebuild")
+def _rebuild_leaderboard(session: Session, context: JobContext) -> dict[str, Any]:
+    leaderboard.rebuild_all(session)
+    return {}
+
+
+@register("tournaments_import")
+def _import_tournaments(session: Session, context: JobContext) -> dict[str, Any]:
+    # Ставится только из POST /tournaments/import: путь к файлу в payload не должен приходить от клиента
+    from app import columnar
+
+    path = context.payload["path"]
+    progress = columnar.ImportProgress()
+    error = None
+    try:
+        size = os.path.getsize(path) or 1
+        with open(path, "rb") as source:
+            columnar.import_batches(
+                session,
+                context.user_id,
+                columnar.read_batches(source),
+                progress,
+                # Файл читается последовательно - позиция в нём и есть доля выполненного
+                on_batch=lambda done: context.progress(
+                    min(source.tell() / size, 0.99), f"загружено {done.imported}, пропущено {done.skipped}"
+                ),
+            )
+    except Exception as e:
+        # Не только ColumnarError: DataError/IntegrityError из базы или потеря аренды
+        # не должны оставить без агрегатов пачки, закоммиченные до ошибки
+        session.rollback()
+        error = e
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+
+    # Пачки, закоммиченные до ошибки, остаются - агрегаты обновляем в любом случае.
+    # Снимки статистики в воркерах приложения сбрасывает NOTIFY события
+    written = leaderboard.refresh_for_moments(session, context.user_id, progress.months)
+    session.commit()
+    leaderboard.apply_periods(context.user_id, written)
+    if progress.imported:
+        events.publish(session, context.user_id, "tournament.imported", {"imported": progress.imported})
+    if isinstance(error, columnar.ColumnarError):
+        raise columnar.ColumnarError(f"{error} (загружено строк до ошибки: {progress.imported})") from error
+    if error is not None:
+        raise error
+    return {"imported": progress.imported, "skipped": progress.skipped}
@@ -0,0 +1,301 @@
+import threading
+import time
+import uuid
+from collections.abc import Callable, Iterable
+from datetime import datetime, timezone
+
+from sortedcontainers import SortedList
+from sqlalchemy import delete, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.metrics import ALL_TIERS, TIER_NAMES, cost_expr, moment_expr, profit_expr, tier_expr
+from app.models import LeaderboardEntry, Torney, User
+
+METRICS = ("profit", "roi", "volume")
+
+
+def period_key(moment: datetime) -> str:
+    return f"{moment.year:04d}-{moment.month:02d}"
+
+
+def period_bounds(period: str) -> tuple[datetime, datetime]:
+    year, month = (int(part) for part in period.split("-"))
+    start = datetime(year, month, 1)
+    end = datetime(year + 1, 1, 1) if month == 12 else datetime(year, month + 1, 1)
+    return start, end
+
+
+def entry_score(metric: str, tournaments: int, cost: int, profit: int) -> float | None:
+    if metric == "profit":
+        return float(profit)
+    if metric == "volume":
+        return float(tournaments)
+    # ROI на маленькой выборке ничего не говорит - такие записи не ранжируем
+    if cost <= 0 or tournaments < settings.LEADERBOARD_ROI_MIN_TOURNAMENTS:
+        return None
+    return round(profit / cost * 100, 2)
+
+
+class RankedBoard:
+    """
+    Один лидерборд, отсортированный по убыванию счёта.
+    Обновление и место игрока - O(log n), страница - O(log n + k).
+    """
+
+    def __init__(self) -> None:
+        self._order = SortedList()
+        self._scores: dict[uuid.UUID, float] = {}
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+    def upsert(self, user_id: uuid.UUID, score: float | None) -> None:
+        self.discard(user_id)
+        if score is not None:
+            self._scores[user_id] = score
+            self._order.add((-score, user_id))
+
+    def discard(self, user_id: uuid.UUID) -> None:
+        score = self._scores.pop(user_id, None)
+        if score is not None:
+            self._order.remove((-score, user_id))
+
+    def score(self, user_id: uuid.UUID) -> float | None:
+        return self._scores.get(user_id)
+
+    def rank(self, user_id: uuid.UUID) -> int | None:
+        score = self._scores.get(user_id)
+        if score is None:
+            return None
+        # Одинаковый счёт делит место: место = число строго лучших + 1
+        return self._order.bisect_left((-score,)) + 1
+
+    def page(self, offset: int, limit: int) -> list[tuple[int, uuid.UUID, float]]:
+        return [
+            (self._order.bisect_left((neg_score,)) + 1, user_id, -neg_score)
+            for neg_score, user_id in self._order.islice(offset, offset + limit)
+        ]
+
+
+class BoardCache:
+    """
+    Лидерборды в памяти процесса, по ключу (метрика, период, ступень).
+    Загружаются из leaderboard_entry при первом чтении и перечитываются раз в ttl,
+    чтобы подхватить изменения из других воркеров. Изменения своего воркера
+    применяются сразу через apply().
+    """
+
+    def __init__(self, ttl_seconds: int) -> None:
+        self._ttl = ttl_seconds
+        self._boards: dict[tuple[str, str, str], tuple[RankedBoard, float]] = {}
+        self._lock = threading.Lock()
+
+    def _board(self, session: Session, metric: str, period: str, tier: str) -> RankedBoard:
+        key = (metric, period, tier)
+        with self._lock:
+            cached = self._boards.get(key)
+            if cached and time.monotonic() - cached[1] < self._ttl:
+                return cached[0]
+
+        board = RankedBoard()
+        statement = select(LeaderboardEntry).where(
+            LeaderboardEntry.period == period, LeaderboardEntry.tier == tier
+        )
+        for entry in session.exec(statement):
+            board.upsert(entry.user_id, entry_score(metric, entry.tournaments, entry.cost, entry.profit))
+
+        with self._lock:
+            self._boards[key] = (board, time.monotonic())
+        return board
+
+    def page(
+        self, session: Session, metric: str, period: str, tier: str, offset: int, limit: int
+    ) -> tuple[int, list[tuple[int, uuid.UUID, float]]]:
+        board = self._board(session, metric, period, tier)
+        with self._lock:
+            return len(board), board.page(offset, limit)
+
+    def position(
+        self, session: Session, metric: str, period: str, tier: str, user_id: uuid.UUID
+    ) -> tuple[int, int | None, float | None]:
+        board = self._board(session, metric, period, tier)
+        with self._lock:
+            return len(board), board.rank(user_id), board.score(user_id)
+
+    def apply(self, user_id: uuid.UUID, period: str, tier: str, stats: tuple[int, int, int] | None) -> None:
+        with self._lock:
+            for metric in METRICS:
+                cached = self._boards.get((metric, period, tier))
+                if not cached:
+                    continue
+                if stats is None:
+                    cached[0].discard(user_id)
+                else:
+                    cached[0].upsert(user_id, entry_score(metric, *stats))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._boards.clear()
+
+
+boards = BoardCache(ttl_seconds=settings.LEADERBOARD_CACHE_TTL_SECONDS)
+
+
+PeriodStats = dict[str, tuple[int, int, int]]
+
+
+def _lock_user_period(session: Session, user_id: uuid.UUID, period: str) -> None:
+    """
+    Параллельные записи одного игрока в один месяц по очереди: второй пересчёт
+    ждёт коммита первого и в своём SELECT уже видит его турнир. Снимается с концом транзакции.
+    """
+    if session.get_bind().dialect.name == "postgresql":
+        session.exec(select(func.pg_advisory_xact_lock(func.hashtext(f"leaderboard:{user_id}:{period}"))))
+
+
+def _upsert_entries(session: Session, values: list[dict]) -> None:
+    dialect = session.get_bind().dialect.name
+    insert = pg_insert if dialect == "postgresql" else sqlite_insert
+    statement = insert(LeaderboardEntry).values(values)
+    session.exec(statement.on_conflict_do_update(
+        index_elements=[LeaderboardEntry.user_id, LeaderboardEntry.period, LeaderboardEntry.tier],
+        set_={
+            name: statement.excluded[name]
+            for name in ("tournaments", "cost", "profit", "updated_at")
+        },
+    ))
+
+
+def write_user_period(session: Session, user_id: uuid.UUID, period: str) -> PeriodStats:
+    """
+    Пересчитывает агрегаты одного игрока за один месяц в текущей транзакции, без коммита.
+    Строки обновляются на месте (ON CONFLICT), удаляются только ступени, где турниров не осталось.
+    """
+    _lock_user_period(session, user_id, period)
+    start, end = period_bounds(period)
+    tier = tier_expr.label("tier")
+    rows = session.exec(
+        select(tier, func.count(), func.sum(cost_expr), func.sum(profit_expr))
+        .where(Torney.user_id == user_id, moment_expr >= start, moment_expr < end)
+        .group_by(tier)
+    ).all()
+
+    stats: PeriodStats = {}
+    total = [0, 0, 0]
+    for tier_name, count, cost, profit in rows:
+        stats[tier_name] = (count, cost or 0, profit or 0)
+        total[0] += count
+        total[1] += cost or 0
+        total[2] += profit or 0
+    if total[0]:
+        stats[ALL_TIERS] = (total[0], total[1], total[2])
+
+    now = datetime.now(timezone.utc)
+    if stats:
+        _upsert_entries(session, [
+            {
+                "user_id": user_id, "period": period, "tier": tier_name,
+                "tournaments": count, "cost": cost, "profit": profit, "updated_at": now,
+            }
+            for tier_name, (count, cost, profit) in stats.items()
+        ])
+    session.exec(
+        delete(LeaderboardEntry).where(
+            LeaderboardEntry.user_id == user_id,
+            LeaderboardEntry.period == period,
+            LeaderboardEntry.tier.not_in(list(stats)),
+        )
+    )
+    return stats
+
+
+def apply_periods(user_id: uuid.UUID, written: dict[str, PeriodStats]) -> None:
+    """Переносит записанные агрегаты в лидерборды в памяти - только после коммита"""
+    for period, stats in written.items():
+        for tier_name in TIER_NAMES:
+            boards.apply(user_id, period, tier_name, stats.get(tier_name))
+
+
+def refresh_user_period(session: Session, user_id: uuid.UUID, period: str) -> None:
+    """Пересчёт одного месяца отдельной транзакцией"""
+    stats = write_user_period(session, user_id, period)
+    session.commit()
+    apply_periods(user_id, {period: stats})
+
+
+def refresh_for_moments(
+    session: Session, user_id: uuid.UUID, moments: Iterable[datetime | None]
+) -> dict[str, PeriodStats]:
+    """
+    Пересчитывает месяцы, которых коснулось создание/изменение/удаление турнира, в той же
+    транзакции, что и само изменение. Коммитит вызывающий, после коммита - apply_periods(результат).
+    """
+    # Блокировки месяцев берём в одном порядке, чтобы два запроса не ждали друг друга по кругу
+    periods = sorted({period_key(moment) for moment in moments if moment})
+    return {period: write_user_period(session, user_id, period) for period in periods}
+
+
+def rebuild_user(session: Session, user_id: uuid.UUID, on_period: Callable[[int, int], None] | None = None) -> int:
+    """Пересчёт всех месяцев одного игрока, включая месяцы, где турниров больше нет"""
+    played = session.exec(
+        select(func.to_char(moment_expr, "YYYY-MM")).where(Torney.user_id == user_id).distinct()
+    ).all()
+    stored = session.exec(
+        select(LeaderboardEntry.period).where(LeaderboardEntry.user_id == user_id).distinct()
+    ).all()
+    periods = sorted(set(played) | set(stored))
+    for done, period in enumerate(periods, start=1):
+        refresh_user_period(session, user_id, period)
+        if on_period:
+            on_period(done, len(periods))
+    return len(periods)
+
+
+def rebuild_all(session: Session) -> None:
+    """Полный пересчёт всех агрегатов (после миграции или для сверки)"""
+    period = func.to_char(moment_expr, "YYYY-MM").label("period")
+    tier = tier_expr.label("tier")
+    rows = session.exec(
+        select(Torney.user_id, period, tier, func.count(), func.sum(cost_expr), func.sum(profit_expr))
+        .group_by(Torney.user_id, period, tier)
+    ).all()
+
+    now = datetime.now(timezone.utc)
+    totals: dict[tuple[uuid.UUID, str], list[int]] = {}
+    entries = []
+    for user_id, period_name, tier_name, count, cost, profit in rows:
+        entries.append(LeaderboardEntry(
+            user_id=user_id, period=period_name, tier=tier_name,
+            tournaments=count, cost=cost or 0, profit=profit or 0, updated_at=now,
+        ))
+        total = totals.setdefault((user_id, period_name), [0, 0, 0])
+        total[0] += count
+        total[1] += cost or 0
+        total[2] += profit or 0
+    for (user_id, period_name), (count, cost, profit) in totals.items():
+        entries.append(LeaderboardEntry(
+            user_id=user_id, period=period_name, tier=ALL_TIERS,
+            tournaments=count, cost=cost, profit=profit, updated_at=now,
+        ))
+
+    session.exec(delete(LeaderboardEntry))
+    session.add_all(entries)
+    session.commit()
+    boards.clear()
+
+
+def user_names(session: Session, user_ids: list[uuid.UUID]) -> dict[uuid.UUID, str | None]:
+    if not user_ids:
+        return {}
+    rows = session.exec(select(User.id, User.full_name).where(User.id.in_(user_ids))).all()
+    return {user_id: full_name for user_id, full_name in rows}
+
+
+if __name__ == "__main__":
+    from app.core.db import get_engine
+
+    with Session(get_engine()) as session:
+        rebuild_all(session)
@@ -1,25 +1,65 @@
 # import logging
+import asyncio
+import sys
+import time
+
+from app.core.startup import StartupTimer
+
+startup = StartupTimer(time.perf_counter())
+
 from collections.abc import Generator
 from fastapi import FastAPI
 from sqlmodel import Session, SQLModel, select
-from app.core.db import engine
+from app.core.db import get_engine, warm_pool
 from contextlib import asynccontextmanager
+from anyio import to_thread
 from sqlmodel import SQLModel
 from app.api.main import api_router
 from app.core.config import settings
-from app.middleware import AuthMiddleware, OptionalAuthMiddleware
+from app.jobs import JobWorkers
+from app.core.revocation import revocations
+from app import events
+from app.middleware import AuthMiddleware, OptionalAuthMiddleware, RateLimitMiddleware
 from fastapi.middleware.cors import CORSMiddleware
 
 # ВАЖНО: Импортируем модели чтобы SQLModel знал о них
 from app.models import User, Torney
 
+startup.lap("imports")
+
 def create_db_and_tables():
-    SQLModel.metadata.create_all(engine)
+    SQLModel.metadata.create_all(get_engine())
 
 @asynccontextmanager
-async def lifespan(_):
-    create_db_and_tables()
+async def lifespan(app: FastAPI):
+    # Синхронные роуты выполняются в пуле потоков AnyIO (по умолчанию 40)
+    to_thread.current_default_thread_limiter().total_tokens = settings.THREADPOOL_SIZE
+    # В проде схемой управляет Alembic (DB_CREATE_TABLES_ON_STARTUP=false):
+    # create_all на каждом воркере - это лишние запросы к каталогу Postgres
+    if settings.DB_CREATE_TABLES_ON_STARTUP:
+        with startup.phase("create_tables"):
+            create_db_and_tables()
+    with startup.phase("db_pool"):
+        warm_pool(settings.DB_POOL_WARM_CONNECTIONS)
+    with startup.phase("revocations"):
+        revocations.start(settings.REVOCATION_SYNC_INTERVAL_SECONDS)
+    with startup.phase("job_workers"):
+        workers = JobWorkers(settings.JOB_WORKERS)
+        workers.start()
+    events.hub.bind(asyncio.get_running_loop())
+    listen = settings.EVENTS_ENABLED and get_engine().dialect.name == "postgresql"
+    if listen:
+        events.listener.start()
+    app.state.startup_timings = startup.report()
     yield
+    events.hub.close()
+    if listen:
+        events.listener.stop()
+    workers.stop()
+    revocations.stop()
+    # Пул симуляций есть только если модуль уже загружался
+    if "app.simulation" in sys.modules:
+        sys.modules["app.simulation"].shutdown_pool()
 
 app = FastAPI(title=settings.PROJECT_NAME, lifespan=lifespan)
 
@@ -30,6 +70,10 @@ app = FastAPI(title=settings.PROJECT_NAME, lifespan=lifespan)
 # Или используйте опциональную проверку
 app.add_middleware(OptionalAuthMiddleware)
 
+# Rate limiting - внутри CORS, чтобы ответ 429 тоже получал CORS-заголовки
+if settings.RATE_LIMIT_ENABLED:
+    app.add_middleware(RateLimitMiddleware, rules=settings.RATE_LIMITS)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
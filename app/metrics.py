@@ -0,0 +1,72 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import case, func
+
+from app.models import Torney
+
+# Денежные метрики турнира, общие для лидербордов, аналитики и агрегатов.
+# Вложено: бай-ин плюс каждый ре-энтри по той же цене.
+# Выиграно: призовые плюс баунти.
+
+# Ступени бай-ина: (название, от включительно, до исключительно)
+BUY_IN_TIERS: tuple[tuple[str, int, int | None], ...] = (
+    ("micro", 0, 11),
+    ("low", 11, 55),
+    ("mid", 55, 215),
+    ("high", 215, None),
+)
+ALL_TIERS = "all"
+TIER_NAMES = tuple(name for name, _, _ in BUY_IN_TIERS) + (ALL_TIERS,)
+
+
+def buy_in_tier(buy_in: int | None) -> str:
+    value = buy_in or 0
+    for name, low, high in BUY_IN_TIERS:
+        if value >= low and (high is None or value < high):
+            return name
+    return BUY_IN_TIERS[0][0]
+
+
+def tourney_cost(tourney: Torney) -> int:
+    return (tourney.buy_in or 0) * (1 + (tourney.re_entry or 0))
+
+
+def tourney_winnings(tourney: Torney) -> int:
+    return (tourney.prize or 0) + (tourney.bounty or 0)
+
+
+def tourney_profit(tourney: Torney) -> int:
+    return tourney_winnings(tourney) - tourney_cost(tourney)
+
+
+def utc_naive(moment: datetime) -> datetime:
+    """Как момент хранится в базе: колонки без часового пояса, время в UTC"""
+    if moment.tzinfo is not None:
+        return moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
+
+
+def tourney_moment(tourney: Torney) -> datetime:
+    """
+    Дата турнира для группировки: play_date, а если её нет - дата создания.
+    До сохранения play_date может прийти со смещением (2026-11-01T01:00+03:00) - приводим
+    к UTC, иначе турнир попадёт не в тот день и месяц, чем после чтения из базы.
+    """
+    return utc_naive(tourney.play_date or tourney.created_at)
+
+
+# Те же определения в виде SQL-выражений
+cost_expr = func.coalesce(Torney.buy_in, 0) * (1 + func.coalesce(Torney.re_entry, 0))
+winnings_expr = func.coalesce(Torney.prize, 0) + func.coalesce(Torney.bounty, 0)
+profit_expr = winnings_expr - cost_expr
+moment_expr = func.coalesce(Torney.play_date, Torney.created_at)
+
+
+def _tier_case():
+    whens = []
+    for name, _, high in BUY_IN_TIERS[:-1]:
+        whens.append((func.coalesce(Torney.buy_in, 0) < high, name))
+    return case(*whens, else_=BUY_IN_TIERS[-1][0])
+
+
+tier_expr = _tier_case()
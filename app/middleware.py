@@ -1,11 +1,12 @@
 from fastapi import Request, HTTPException, status
 from fastapi.responses import JSONResponse
 from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
-import jwt
-from app.core.config import settings
-from app.core.security import ALGORITHM, verify_token
-from app.models import TokenPayload
+from starlette.types import ASGIApp, Receive, Scope, Send
+import json
+import math
+from urllib.parse import parse_qs
+from app.core.rate_limit import InMemoryBackend, Limit, RateLimitBackend, parse_limit
+from app.core.security import verify_token
 import logging
 
 logger = logging.getLogger(__name__)
@@ -75,34 +76,16 @@ class AuthMiddleware(BaseHTTPMiddleware):
                 content={"detail": "Invalid authorization header format. Use 'Bearer <token>'"}
             )
         
-        # Верифицируем токен
-        try:
-            payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
-            token_data = TokenPayload(**payload)
-            
-            if not token_data.sub:
-                raise jwt.InvalidTokenError("Token missing subject")
-                
-            # Добавляем user_id в состояние запроса для использования в роутах
-            request.state.user_id = token_data.sub
-            
-        except jwt.ExpiredSignatureError:
-            return JSONResponse(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                content={"detail": "Token has expired"}
-            )
-        except jwt.InvalidTokenError as e:
-            logger.warning(f"Invalid token: {e}")
-            return JSONResponse(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                content={"detail": "Invalid token"}
-            )
-        except Exception as e:
-            logger.error(f"Token validation error: {e}")
+        # Верифицируем токен: подпись, срок, тип (не refresh и не stream) и отзыв - как в get_current_user
+        token_data = verify_token(token)
+        if token_data is None or not token_data.sub:
             return JSONResponse(
                 status_code=status.HTTP_401_UNAUTHORIZED,
-                content={"detail": "Token validation failed"}
+                content={"detail": "Invalid or expired token"}
             )
+
+        # Добавляем user_id в состояние запроса для использования в роутах
+        request.state.user_id = token_data.sub
         
         # Продолжаем обработку запроса
         response = await call_next(request)
@@ -118,25 +101,147 @@ class OptionalAuthMiddleware(BaseHTTPMiddleware):
         """Обрабатывает каждый HTTP запрос"""
         
         authorization = request.headers.get("Authorization")
+        token_data = None
         
         if authorization:
-            try:
-                scheme, token = authorization.split()
-                if scheme.lower() == "bearer":
-                    payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
-                    token_data = TokenPayload(**payload)
-                    
-                    if token_data.sub:
-                        request.state.user_id = token_data.sub
-                        request.state.authenticated = True
-                    else:
-                        request.state.authenticated = False
-                else:
-                    request.state.authenticated = False
-            except (jwt.InvalidTokenError, ValueError, jwt.ExpiredSignatureError):
-                request.state.authenticated = False
+            scheme, _, token = authorization.partition(" ")
+            if scheme.lower() == "bearer":
+                token_data = verify_token(token.strip())
+        
+        if token_data and token_data.sub:
+            request.state.user_id = token_data.sub
+            request.state.authenticated = True
         else:
             request.state.authenticated = False
         
         response = await call_next(request)
-        return response 
\ No newline at end of file
+        return response
+
+
+class RateLimitMiddleware:
+    """
+    ASGI middleware с token bucket для отдельных роутов.
+    Правила: {"METHOD /path": ["ip:20/minute", "email:5/minute"]}, путь с * на конце - префикс.
+    Лишние запросы получают 429 с Retry-After и до роута не доходят.
+    """
+
+    # Больше этого тело не читаем - email ищем только в маленьких формах
+    MAX_BODY_BYTES = 64 * 1024
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        rules: dict[str, list[str]],
+        backend: RateLimitBackend | None = None,
+    ):
+        self.app = app
+        self.backend = backend or InMemoryBackend()
+        self.exact_rules: dict[tuple[str, str], tuple[str, list[Limit]]] = {}
+        self.prefix_rules: list[tuple[str, str, str, list[Limit]]] = []
+        for route, specs in rules.items():
+            method, _, path = route.partition(" ")
+            limits = [parse_limit(spec) for spec in specs]
+            if path.endswith("*"):
+                self.prefix_rules.append((method.upper(), path[:-1], route, limits))
+            else:
+                self.exact_rules[(method.upper(), path)] = (route, limits)
+
+    def _match(self, method: str, path: str) -> tuple[str, list[Limit]] | None:
+        rule = self.exact_rules.get((method, path))
+        if rule:
+            return rule
+        for rule_method, prefix, route, limits in self.prefix_rules:
+            if rule_method == method and path.startswith(prefix):
+                return route, limits
+        return None
+
+    @staticmethod
+    def _client_ip(scope: Scope) -> str | None:
+        # X-Forwarded-For от доверенных прокси разбирает uvicorn (proxy_headers), сюда приходит уже реальный адрес
+        client = scope.get("client")
+        return client[0] if client else None
+
+    @staticmethod
+    def _user_id(scope: Scope) -> str | None:
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                scheme, _, token = value.decode("latin-1").partition(" ")
+                if scheme.lower() == "bearer":
+                    token_data = verify_token(token)
+                    return token_data.sub if token_data else None
+        return None
+
+    @staticmethod
+    def _email(scope: Scope, body: bytes) -> str | None:
+        content_type = ""
+        for name, value in scope["headers"]:
+            if name == b"content-type":
+                content_type = value.decode("latin-1")
+        try:
+            if content_type.startswith("application/json"):
+                data = json.loads(body or b"{}")
+                email = data.get("email") if isinstance(data, dict) else None
+            elif content_type.startswith("application/x-www-form-urlencoded"):
+                # OAuth2 форма логина передаёт email в username
+                email = (parse_qs(body.decode()).get("username") or [None])[0]
+            else:
+                return None
+        except (ValueError, UnicodeDecodeError):
+            return None
+        return email.strip().lower() if isinstance(email, str) and email else None
+
+    async def _read_body(self, receive: Receive) -> tuple[bytes, Receive]:
+        """Читает тело запроса и возвращает receive, который отдаст его роуту заново"""
+        messages = []
+        size = 0
+        while True:
+            message = await receive()
+            messages.append(message)
+            size += len(message.get("body", b""))
+            if message["type"] != "http.request" or not message.get("more_body") or size > self.MAX_BODY_BYTES:
+                break
+        body = b"".join(m.get("body", b"") for m in messages) if size <= self.MAX_BODY_BYTES else b""
+
+        async def replay() -> dict:
+            if messages:
+                return messages.pop(0)
+            return await receive()
+
+        return body, replay
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        rule = self._match(scope["method"], scope["path"])
+        if rule is None:
+            await self.app(scope, receive, send)
+            return
+
+        route, limits = rule
+        body = b""
+        if any(limit.key == "email" for limit in limits):
+            body, receive = await self._read_body(receive)
+
+        for limit in limits:
+            if limit.key == "ip":
+                value = self._client_ip(scope)
+            elif limit.key == "user":
+                # Без токена ограничиваем по IP, чтобы анонимы не обходили лимит
+                value = self._user_id(scope) or f"ip={self._client_ip(scope)}"
+            else:
+                value = self._email(scope, body)
+            if value is None:
+                continue
+            # Уже взятые из предыдущих вёдер токены не возвращаем - отказ всё равно отказ
+            allowed, retry_after = await self.backend.hit(f"{route}|{limit.key}={value}", limit)
+            if not allowed:
+                response = JSONResponse(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    content={"detail": "Слишком много запросов, попробуйте позже"},
+                    headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+                )
+                await response(scope, receive, send)
+                return
+
+        await self.app(scope, receive, send)
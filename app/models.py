@@ -1,8 +1,9 @@
 import uuid
-from pydantic import EmailStr
+from pydantic import EmailStr, field_validator
+from sqlalchemy import JSON, Index, UniqueConstraint, text
 from sqlmodel import Field, Relationship, SQLModel
-from datetime import datetime, timezone
-from typing import Optional
+from datetime import date, datetime, timezone
+from typing import Any, Optional
 # Shared properties
 class UserBase(SQLModel):
     email: EmailStr = Field(unique=True, index=True, max_length=255)
@@ -51,7 +52,29 @@ class User(UserBase, table=True):
 class UserPublic(UserBase):
     id: uuid.UUID
 
+# Серия турниров (измерение): один и тот же регулярный турнир у всех игроков.
+# Ключ - нормализованное название, сайт и бай-ин; статистика агрегируется по целому id
+class TournamentSeries(SQLModel, table=True):
+    __tablename__ = "tournament_series"
+    __table_args__ = (
+        UniqueConstraint("name_key", "site", "buy_in", name="uq_tournament_series_key"),
+    )
+
+    id: int | None = Field(default=None, primary_key=True)
+    name: str = Field(max_length=255)
+    name_key: str = Field(max_length=255)  # lower(trim(name))
+    site: str = Field(default="", max_length=64)
+    buy_in: int = Field(default=0)
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+
 class Torney(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_torney_user_id_series_id", "user_id", "series_id"),
+        # Пересчёт лидерборда и окна статистики фильтруют по metrics.moment_expr
+        Index("ix_torney_user_id_moment", "user_id", text("coalesce(play_date, created_at)")),
+    )
+
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
@@ -62,10 +85,29 @@ class Torney(SQLModel, table=True):
     bounty: int | None
     prize: int | None
 
+    # Название пока хранится и в самой строке - его читают текущие клиенты и поиск
+    series_id: int | None = Field(default=None, foreign_key="tournament_series.id")
+
     user_id: uuid.UUID = Field(foreign_key="user.id")
     user: User = Relationship(back_populates='tournaments')
 
 
+# Допустимые даты турнира (UTC): опечатка в годе (0026, 9999) не должна попасть в агрегаты
+PLAY_DATE_MIN = datetime(1990, 1, 1)
+PLAY_DATE_MAX = datetime(2100, 1, 1)
+
+
+def normalize_play_date(value: datetime | None) -> datetime | None:
+    if value is None:
+        return value
+    # Колонка без часового пояса: храним UTC, а не локальное время клиента
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    if not PLAY_DATE_MIN <= value < PLAY_DATE_MAX:
+        raise ValueError(f"play_date должна быть между {PLAY_DATE_MIN:%Y-%m-%d} и {PLAY_DATE_MAX:%Y-%m-%d}")
+    return value
+
+
 class TorneyCreate(SQLModel):
     name: str = Field(max_length=255)
     play_date: Optional[datetime] = None
@@ -74,6 +116,8 @@ class TorneyCreate(SQLModel):
     bounty: Optional[int] = None
     prize: Optional[int] = None
 
+    _play_date = field_validator("play_date")(normalize_play_date)
+
 class TorneyUpdate(SQLModel):
     name: Optional[str] = Field(default=None, max_length=255)
     play_date: Optional[datetime] = None
@@ -82,6 +126,8 @@ class TorneyUpdate(SQLModel):
     bounty: Optional[int] = None
     prize: Optional[int] = None
 
+    _play_date = field_validator("play_date")(normalize_play_date)
+
 class TorneyRead(SQLModel):
     id: uuid.UUID
     name: str
@@ -95,6 +141,202 @@ class TorneyRead(SQLModel):
     user_id: uuid.UUID
     user: Optional[UserBase] = None
 
+# Предрасчитанные агрегаты игрока за месяц и ступень бай-ина (tier='all' - итог за месяц)
+class LeaderboardEntry(SQLModel, table=True):
+    __tablename__ = "leaderboard_entry"
+    __table_args__ = (
+        Index("ix_leaderboard_entry_period_tier_profit", "period", "tier", "profit"),
+    )
+
+    user_id: uuid.UUID = Field(foreign_key="user.id", primary_key=True)
+    period: str = Field(primary_key=True, max_length=7)  # 'YYYY-MM'
+    tier: str = Field(primary_key=True, max_length=16)
+    tournaments: int = Field(default=0)
+    cost: int = Field(default=0)
+    profit: int = Field(default=0)
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+
+class LeaderboardRow(SQLModel):
+    rank: int
+    user_id: uuid.UUID
+    full_name: str | None = None
+    value: float
+
+class LeaderboardPage(SQLModel):
+    metric: str
+    period: str
+    tier: str
+    total: int
+    items: list[LeaderboardRow]
+
+class LeaderboardRank(SQLModel):
+    metric: str
+    period: str
+    tier: str
+    total: int
+    rank: int | None = None
+    value: float | None = None
+
+# Кривая результатов: серии отдаются колонками, по индексу точки
+class AnalyticsCurve(SQLModel):
+    tournaments: int
+    total_cost: int
+    total_profit: int
+    roi: float | None = None
+    stddev: float | None = None
+    max_drawdown: int
+    max_drawdown_start: datetime | None = None
+    max_drawdown_end: datetime | None = None
+    play_date: list[datetime]
+    cumulative_profit: list[int]
+    drawdown: list[int]
+    rolling_roi: list[float | None]
+    rolling_stddev: list[float | None]
+
+class SimulationRequest(SQLModel):
+    bankroll: int = Field(gt=0)
+    horizon: int = Field(default=1000, gt=0)  # турниров в каждом будущем
+    simulations: int = Field(default=10000, gt=0)
+    seed: int = Field(default=0, ge=0)
+
+class SimulationBand(SQLModel):
+    tournament: int
+    p5: float
+    p25: float
+    p50: float
+    p75: float
+    p95: float
+
+class SimulationResult(SQLModel):
+    sample_size: int
+    bankroll: int
+    horizon: int
+    seed: int
+    simulations: int
+    truncated: bool
+    average_profit: float
+    risk_of_ruin: float
+    expected_final_bankroll: float
+    expected_max_downswing: float
+    max_downswing_p95: float
+    bands: list[SimulationBand]
+    elapsed_ms: float
+
+# Фоновые задачи: очередь в Postgres, воркеры забирают через FOR UPDATE SKIP LOCKED
+class Job(SQLModel, table=True):
+    __tablename__ = "job"
+    __table_args__ = (
+        Index("ix_job_status_run_after", "status", "run_after"),
+    )
+
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    kind: str = Field(max_length=64)
+    payload: dict[str, Any] = Field(default_factory=dict, sa_type=JSON)
+    status: str = Field(default="queued", max_length=16)  # queued | running | succeeded | failed
+    progress: float = Field(default=0.0)
+    message: str | None = Field(default=None, max_length=255)
+    result: dict[str, Any] | None = Field(default=None, sa_type=JSON)
+    error: str | None = Field(default=None)
+    attempts: int = Field(default=0)
+    max_attempts: int = Field(default=3)
+    run_after: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    locked_by: str | None = Field(default=None, max_length=255)
+    locked_at: datetime | None = Field(default=None)
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+    user_id: uuid.UUID | None = Field(default=None, foreign_key="user.id", index=True)
+
+class JobCreate(SQLModel):
+    kind: str = Field(max_length=64)
+    payload: dict[str, Any] = Field(default_factory=dict)
+
+class JobRead(SQLModel):
+    id: uuid.UUID
+    kind: str
+    status: str
+    progress: float
+    message: str | None = None
+    result: dict[str, Any] | None = None
+    error: str | None = None
+    attempts: int
+    max_attempts: int
+    run_after: datetime
+    created_at: datetime
+    updated_at: datetime
+
+class TorneySearchHit(SQLModel):
+    id: uuid.UUID
+    name: str
+    play_date: Optional[datetime] = None
+    buy_in: Optional[int] = None
+    re_entry: Optional[int] = None
+    bounty: Optional[int] = None
+    prize: Optional[int] = None
+    score: float
+
+class TorneySearchPage(SQLModel):
+    items: list[TorneySearchHit]
+    limit: int
+    offset: int
+    has_more: bool
+
+# Пакетный запрос: несколько именованных окон за один проход по турнирам игрока
+class TorneyWindow(SQLModel):
+    start_date: datetime | None = None
+    end_date: datetime | None = None  # включительно
+    tier: str | None = None  # ступень бай-ина, None - все
+    series_id: int | None = None
+    min_buy_in: int | None = None
+    max_buy_in: int | None = None
+
+class TorneyBatchQuery(SQLModel):
+    windows: dict[str, TorneyWindow] = Field(min_length=1, max_length=12)
+    include_tournaments: bool = False
+
+class TorneyWindowResult(SQLModel):
+    tournaments: int
+    cost: int
+    winnings: int
+    profit: int
+    roi: float | None = None
+    itm: int  # турниров с призовыми
+    items: list[TorneyRead] | None = None
+
+class TorneyBatchResult(SQLModel):
+    windows: dict[str, TorneyWindowResult]
+
+class SeriesStats(SQLModel):
+    series_id: int
+    name: str
+    site: str
+    buy_in: int
+    tournaments: int
+    cost: int
+    profit: int
+    roi: float | None = None
+    itm: int  # турниров с призовыми
+    last_played: datetime | None = None
+
+# Итоги из снимка статистики в памяти (app/snapshots.py)
+class StatsTotals(SQLModel):
+    tournaments: int
+    cost: int
+    winnings: int
+    profit: int
+    roi: float | None = None
+
+class TierStats(StatsTotals):
+    tier: str
+
+class DayStats(StatsTotals):
+    day: date
+
+class UserStats(StatsTotals):
+    tiers: list[TierStats]
+    days: list[DayStats]
+
 class Message(SQLModel):
     message: str
 
@@ -110,14 +352,36 @@ class TokenWithRefresh(SQLModel):
     token_type: str = "bearer"
 
 
+# Токен для ?token= в GET /events/stream
+class StreamToken(SQLModel):
+    token: str
+    expires_in: int  # секунд
+
+
 # Contents of JWT token
 class TokenPayload(SQLModel):
     sub: str | None = None
+    jti: str | None = None
+    type: str | None = None  # access | refresh | stream
+    exp: int | None = None
+
+
+# Отозванные токены (logout, ротация refresh-токена); строки живут до истечения токена
+class RevokedToken(SQLModel, table=True):
+    __tablename__ = "revoked_token"
+
+    jti: str = Field(primary_key=True, max_length=32)
+    user_id: uuid.UUID = Field(foreign_key="user.id", index=True)
+    expires_at: datetime
+    revoked_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc), index=True)
 
 # Refresh token request
 class RefreshTokenRequest(SQLModel):
     refresh_token: str
 
+class LogoutRequest(SQLModel):
+    refresh_token: str | None = None
+
 
 class NewPassword(SQLModel):
     token: str
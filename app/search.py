@@ -0,0 +1,96 @@
+import uuid
+
+from sqlalchemy import case, func, literal, or_
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.models import Torney
+
+# Поиск турниров игрока по названию.
+# В Postgres - pg_trgm: GIN-индекс ix_torney_user_name_trgm по (user_id, name) из миграции
+# покрывает и ILIKE '%...%', и нечёткое совпадение по словам (оператор <%).
+# В остальных СУБД (SQLite в тестах) - похожесть названий считается в Python (name_score).
+
+
+def _like_pattern(value: str, prefix: bool = False) -> str:
+    escaped = value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"{escaped}%" if prefix else f"%{escaped}%"
+
+
+def _search_postgres(
+    session: Session, user_id: uuid.UUID, query: str, limit: int, offset: int
+) -> list[tuple[Torney, float]]:
+    # Порог word_similarity только для этой транзакции
+    session.exec(
+        select(func.set_config("pg_trgm.word_similarity_threshold", str(settings.SEARCH_SIMILARITY_THRESHOLD), True))
+    )
+    score = func.word_similarity(query, Torney.name)
+    statement = (
+        select(Torney, score)
+        .where(
+            Torney.user_id == user_id,
+            or_(Torney.name.ilike(_like_pattern(query), escape="\\"), literal(query).op("<%")(Torney.name)),
+        )
+        .order_by(
+            # Сначала названия, которые начинаются с запроса, потом по похожести
+            case((Torney.name.ilike(_like_pattern(query, prefix=True), escape="\\"), 0), else_=1),
+            score.desc(),
+            Torney.play_date.desc().nulls_last(),
+        )
+        .offset(offset)
+        .limit(limit)
+    )
+    return [(tourney, float(value)) for tourney, value in session.exec(statement).all()]
+
+
+def _trigrams(word: str) -> set[str]:
+    # Как в pg_trgm: слово дополняется двумя пробелами слева и одним справа
+    padded = f"  {word} "
+    return {padded[index:index + 3] for index in range(len(padded) - 2)}
+
+
+def name_score(query: str, name: str) -> float:
+    """
+    Похожесть названия на запрос, 0..1, по смыслу близкая к word_similarity из pg_trgm:
+    подстрока - 1, иначе среднее по словам запроса сходства триграмм с ближайшим словом названия.
+    Оба аргумента - в нижнем регистре.
+    """
+    if query in name:
+        return 1.0
+    candidates = [_trigrams(word) for word in name.split()]
+    if not candidates:
+        return 0.0
+    per_word = []
+    for word in query.split():
+        trigrams = _trigrams(word)
+        per_word.append(max(len(trigrams & other) / len(trigrams | other) for other in candidates))
+    return sum(per_word) / len(per_word)
+
+
+def _search_fallback(
+    session: Session, user_id: uuid.UUID, query: str, limit: int, offset: int
+) -> list[tuple[Torney, float]]:
+    # Без индекса триграмм: сравниваем в Python, но каждое различное название один раз -
+    # у регулярных турниров названия повторяются, их на порядки меньше, чем строк
+    needle = query.lower()
+    names = session.exec(select(Torney.name).where(Torney.user_id == user_id).distinct()).all()
+    scores = {name: name_score(needle, name.lower()) for name in names}
+    matched = [name for name, score in scores.items() if score >= settings.SEARCH_SIMILARITY_THRESHOLD]
+    if not matched:
+        return []
+    statement = select(Torney).where(Torney.user_id == user_id, Torney.name.in_(matched))
+    ranked = []
+    for tourney in session.exec(statement).all():
+        score = scores[tourney.name]
+        ranked.append((not tourney.name.lower().startswith(needle), -score, tourney, score))
+    ranked.sort(key=lambda item: (item[0], item[1], -(item[2].play_date.timestamp() if item[2].play_date else 0)))
+    return [(tourney, score) for _, _, tourney, score in ranked[offset:offset + limit]]
+
+
+def search_tournaments(
+    session: Session, user_id: uuid.UUID, query: str, limit: int, offset: int
+) -> list[tuple[Torney, float]]:
+    query = " ".join(query.split())
+    if session.get_bind().dialect.name == "postgresql":
+        return _search_postgres(session, user_id, query, limit, offset)
+    return _search_fallback(session, user_id, query, limit, offset)
@@ -0,0 +1,254 @@
+"""
+Синтетические данные для нагрузочных проверок: игроки и миллионы турниров.
+
+    python -m app.seed_data --users 2000 --rows 2000000 --seed 42
+    python -m app.seed_data --reset            # удалить всех сгенерированных игроков
+
+Распределения похожи на реальные: объём по игрокам - степенной (немного гриндеров играют
+большую часть турниров), у каждого игрока свой уровень лимитов, призы редкие и с тяжёлым хвостом.
+Одинаковые --seed, --users, --rows, --days и --until дают одинаковые данные.
+Загрузка - COPY FROM STDIN пачками, только Postgres. Время прогона замеряйте
+python -m benchmarks.bench_endpoints.
+"""
+import argparse
+import io
+import time
+import uuid
+from datetime import date, datetime, timedelta
+
+import numpy as np
+from sqlalchemy import delete, inspect, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlmodel import Session, SQLModel
+
+from app import leaderboard
+from app.core.db import get_engine
+from app.core.security import get_password_hash
+from app.crud import series_key
+from app.models import TournamentSeries, User
+
+DEFAULT_DOMAIN = "seed.example.com"
+# Пароль всех сгенерированных игроков - хэш считается один раз
+SEED_PASSWORD = "seed-password"
+
+# Лестница бай-инов популярных румов
+BUY_INS = np.array([1, 2, 3, 5, 7, 11, 16, 22, 33, 44, 55, 82, 109, 162, 215, 320, 530, 1050, 2100])
+# (название, нокаут-турнир)
+BRANDS = (
+    ("Sunday Million", False), ("Bounty Builder", True), ("Big", False), ("Hot", False),
+    ("Mini Main Event", False), ("Daily Hyper", False), ("Turbo Series", False), ("Thursday Thrill", False),
+    ("Saturday KO", True), ("Progressive KO", True), ("Night on the Stars", False), ("Zodiac", False),
+    ("Deepstack", False), ("Mystery Bounty", True), ("Micro Millions", False), ("Big Game", False),
+    ("Sunday Storm", False), ("Daily Cooldown", False), ("Bounty Hunters", True), ("Speed Racer", False),
+)
+SERIES_PER_BUY_IN = 6
+COPY_ROWS = 100_000
+
+TORNEY_COLUMNS = (
+    "id", "created_at", "updated_at", "play_date", "name",
+    "buy_in", "re_entry", "bounty", "prize", "series_id", "user_id",
+)
+
+
+def seed_emails(domain: str) -> str:
+    return f"%@{domain}"
+
+
+def build_catalog(rng: np.random.Generator) -> list[tuple[str, int, bool]]:
+    """Серии: на каждом бай-ине несколько брендов, название вида 'Bounty Builder $33'"""
+    catalog = []
+    for buy_in in BUY_INS.tolist():
+        for brand in rng.choice(len(BRANDS), size=SERIES_PER_BUY_IN, replace=False).tolist():
+            name, knockout = BRANDS[brand]
+            catalog.append((f"{name} ${buy_in}", buy_in, knockout))
+    return catalog
+
+
+def user_volumes(rng: np.random.Generator, users: int, rows: int) -> np.ndarray:
+    """Степенной закон (Парето, alpha=1.16 - «80/20»), у каждого хотя бы один турнир"""
+    weights = rng.pareto(1.16, size=users) + 1
+    volumes = np.floor(weights / weights.sum() * (rows - users)).astype(np.int64) + 1
+    # Остаток от округления - самым активным
+    volumes[np.argsort(-weights)[: rows - int(volumes.sum())]] += 1
+    return volumes
+
+
+def generate_user_rows(
+    rng: np.random.Generator,
+    count: int,
+    until: datetime,
+    days: int,
+    series_by_level: np.ndarray,
+    knockout_series: np.ndarray,
+) -> dict[str, np.ndarray]:
+    # Профиль игрока: уровень лимитов, насколько он разбросан, и насколько хорошо играет
+    stake = np.clip(rng.normal(5.5, 2.5), 0, len(BUY_INS) - 1)
+    spread = rng.uniform(0.6, 1.8)
+    itm_rate = np.clip(rng.normal(0.15, 0.025), 0.08, 0.25)
+    active_days = int(rng.integers(min(30, days), days + 1))
+
+    level = np.clip(np.rint(rng.normal(stake, spread, size=count)), 0, len(BUY_INS) - 1).astype(np.int64)
+    buy_in = BUY_INS[level]
+    series = series_by_level[level, rng.integers(0, series_by_level.shape[1], size=count)]
+    knockout = knockout_series[series]
+
+    # Ре-энтри примерно в каждом четвёртом турнире, обычно один
+    re_entry = np.where(rng.random(count) < 0.25, rng.geometric(0.7, size=count), 0)
+    # Призовые: ITM редко, а размер приза - тяжёлый хвост (мин-кэш ~1.5 бай-ина, редкие победы - сотни)
+    itm = rng.random(count) < itm_rate
+    multiplier = np.minimum(1.5 + rng.pareto(1.25, size=count) * 1.6, 3000)
+    prize = np.where(itm, np.rint(buy_in * multiplier), 0).astype(np.int64)
+    bounty = np.where(knockout & (rng.random(count) < 0.45), np.rint(buy_in * rng.exponential(0.6, size=count)), 0)
+
+    # Играют в основном вечером: день равномерно по активному периоду, час ~ N(20, 3)
+    day = rng.integers(0, active_days, size=count)
+    seconds = (np.rint(rng.normal(20, 3, size=count) * 3600).astype(np.int64) % 86400)
+    start = np.datetime64(until - timedelta(days=active_days - 1), "s")
+    play_date = start + (day * 86400 + seconds).astype("timedelta64[s]")
+    # Запись вносят после турнира
+    created_at = play_date + rng.integers(1800, 6 * 3600, size=count).astype("timedelta64[s]")
+    return {
+        "created_at": created_at,
+        "play_date": play_date,
+        "series": series,
+        "buy_in": buy_in,
+        "re_entry": re_entry.astype(np.int64),
+        "bounty": bounty.astype(np.int64),
+        "prize": prize,
+    }
+
+
+def _uuids(rng: np.random.Generator, count: int) -> list[str]:
+    raw = rng.bytes(16 * count)
+    return [str(uuid.UUID(bytes=raw[offset:offset + 16], version=4)) for offset in range(0, 16 * count, 16)]
+
+
+def _copy(cursor, table: str, columns: tuple[str, ...], buffer: io.StringIO) -> None:
+    buffer.seek(0)
+    cursor.copy_expert(f'COPY "{table}" ({", ".join(columns)}) FROM STDIN WITH (FORMAT csv)', buffer)
+
+
+def reset(session: Session, domain: str) -> int:
+    """Удаляет сгенерированных игроков и всё, что на них ссылается"""
+    user_ids = select(User.id).where(User.email.like(seed_emails(domain))).scalar_subquery()
+    for table in reversed(SQLModel.metadata.sorted_tables):
+        if table.name != "user" and "user_id" in table.c:
+            session.exec(delete(table).where(table.c.user_id.in_(user_ids)))
+    deleted = session.exec(delete(User).where(User.email.like(seed_emails(domain)))).rowcount
+    session.commit()
+    return deleted
+
+
+def seed(
+    session: Session,
+    users: int,
+    rows: int,
+    seed_value: int,
+    days: int,
+    until: datetime,
+    domain: str,
+) -> None:
+    if session.get_bind().dialect.name != "postgresql":
+        raise SystemExit("Генератор загружает данные через COPY - нужен Postgres")
+    rng = np.random.default_rng(seed_value)
+    started = time.perf_counter()
+
+    catalog = build_catalog(rng)
+    values = [
+        {"name": name, "name_key": series_key(name, buy_in)[0], "site": "", "buy_in": buy_in}
+        for name, buy_in, _ in catalog
+    ]
+    session.exec(pg_insert(TournamentSeries).values(values).on_conflict_do_nothing())
+    session.commit()
+    stored = {
+        (name_key, buy_in): series_id
+        for series_id, name_key, buy_in in session.exec(
+            select(TournamentSeries.id, TournamentSeries.name_key, TournamentSeries.buy_in).where(TournamentSeries.site == "")
+        ).all()
+    }
+    series_ids = [stored[(series_key(name, buy_in)[0], buy_in)] for name, buy_in, _ in catalog]
+    # Индексы серий каталога по ступени лестницы бай-инов: (len(BUY_INS), SERIES_PER_BUY_IN)
+    series_by_level = np.arange(len(catalog)).reshape(len(BUY_INS), SERIES_PER_BUY_IN)
+    knockout_series = np.array([knockout for _, _, knockout in catalog], dtype=bool)
+
+    user_ids = _uuids(rng, users)
+    volumes = user_volumes(rng, users, rows)
+    # Колонка is_active есть в схеме из миграций, но не в модели
+    user_columns = ("id", "email", "full_name", "hashed_password")
+    if "is_active" in {column["name"] for column in inspect(session.get_bind()).get_columns("user")}:
+        user_columns += ("is_active",)
+    hashed = get_password_hash(SEED_PASSWORD)
+
+    connection = session.connection().connection
+    with connection.cursor() as cursor:
+        buffer = io.StringIO()
+        for index, user_id in enumerate(user_ids):
+            line = [user_id, f"seed{index:07d}@{domain}", f"Seed Player {index}", hashed]
+            if "is_active" in user_columns:
+                line.append("t")
+            buffer.write(",".join(line) + "\n")
+        _copy(cursor, "user", user_columns, buffer)
+
+        buffer, buffered, written = io.StringIO(), 0, 0
+        for user_id, volume in zip(user_ids, volumes.tolist()):
+            generated = generate_user_rows(rng, volume, until, days, series_by_level, knockout_series)
+            ids = _uuids(rng, volume)
+            created = np.datetime_as_string(generated["created_at"]).tolist()
+            played = np.datetime_as_string(generated["play_date"]).tolist()
+            for tourney_id, created_at, play_date, series, buy_in, re_entry, bounty, prize in zip(
+                ids, created, played,
+                generated["series"].tolist(), generated["buy_in"].tolist(), generated["re_entry"].tolist(),
+                generated["bounty"].tolist(), generated["prize"].tolist(),
+            ):
+                buffer.write(
+                    f"{tourney_id},{created_at},{created_at},{play_date},{catalog[series][0]},"
+                    f"{buy_in},{re_entry},{bounty},{prize},{series_ids[series]},{user_id}\n"
+                )
+            buffered += volume
+            if buffered >= COPY_ROWS:
+                _copy(cursor, "torney", TORNEY_COLUMNS, buffer)
+                written += buffered
+                buffer, buffered = io.StringIO(), 0
+                print(f"  {written:>10,} / {rows:,} турниров  {time.perf_counter() - started:6.1f} s")
+        if buffered:
+            _copy(cursor, "torney", TORNEY_COLUMNS, buffer)
+    session.commit()
+    print(f"Загружено игроков: {users:,}, турниров: {rows:,} за {time.perf_counter() - started:.1f} s")
+
+    # Статистика планировщика после массовой загрузки
+    session.exec(text('ANALYZE "user"'))
+    session.exec(text("ANALYZE torney"))
+    session.commit()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Синтетические игроки и турниры для нагрузочных проверок")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--rows", type=int, default=1_000_000, help="всего турниров")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--days", type=int, default=730, help="глубина истории")
+    parser.add_argument("--until", type=date.fromisoformat, default=date.today(), help="последний день истории (YYYY-MM-DD)")
+    parser.add_argument("--domain", default=DEFAULT_DOMAIN, help="домен email сгенерированных игроков")
+    parser.add_argument("--reset", action="store_true", help="только удалить ранее сгенерированных игроков")
+    parser.add_argument("--skip-leaderboard", action="store_true", help="не пересчитывать лидерборды")
+    args = parser.parse_args()
+
+    with Session(get_engine()) as session:
+        deleted = reset(session, args.domain)
+        if deleted:
+            print(f"Удалено сгенерированных игроков: {deleted:,}")
+        if args.reset:
+            return
+        if args.rows < args.users:
+            raise SystemExit("--rows должно быть не меньше --users")
+        until = datetime.combine(args.until, datetime.min.time())
+        print(f"seed={args.seed} users={args.users} rows={args.rows} days={args.days} until={args.until}")
+        seed(session, args.users, args.rows, args.seed, args.days, until, args.domain)
+        if not args.skip_leaderboard:
+            started = time.perf_counter()
+            leaderboard.rebuild_all(session)
+            print(f"Лидерборды пересчитаны за {time.perf_counter() - started:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Продакшн-запуск: несколько воркеров uvicorn с пулами соединений,
+поделенными так, чтобы все процессы вместе не превысили max_connections Postgres.
+
+    python -m app.server
+"""
+import os
+
+import uvicorn
+
+from app.core.config import settings
+
+
+def connection_budget() -> int:
+    return settings.POSTGRES_MAX_CONNECTIONS - settings.DB_RESERVED_CONNECTIONS
+
+
+def worker_overhead() -> int:
+    """Соединения воркера помимо пула запросов: процессы фоновых задач и LISTEN живых событий"""
+    return settings.JOB_WORKERS * settings.JOB_DB_POOL_SIZE + int(settings.EVENTS_ENABLED)
+
+
+def available_cpus() -> int:
+    # Ядра, на которых процессу разрешено работать (cpuset контейнера, taskset), а не все ядра хоста
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # macOS, Windows
+        return os.cpu_count() or 1
+
+
+def worker_count() -> int:
+    """
+    WEB_CONCURRENCY, если задан явно. Иначе по числу доступных ядер, но не больше,
+    чем помещается в бюджет соединений (хотя бы одно соединение пула на воркер).
+    """
+    if settings.WEB_CONCURRENCY:
+        return settings.WEB_CONCURRENCY
+    fits = connection_budget() // (worker_overhead() + 1)
+    return max(1, min(available_cpus(), fits))
+
+
+def pool_limits(workers: int) -> tuple[int, int]:
+    """
+    (pool_size, max_overflow) для одного воркера.
+    Бюджет - max_connections минус резерв (миграции, админка, бэкапы), делится поровну
+    между воркерами; из доли воркера вычитаются соединения его процессов фоновых задач
+    и соединение LISTEN для живых событий.
+    """
+    budget = connection_budget()
+    per_worker = budget // workers - worker_overhead()
+    if per_worker < 1:
+        raise SystemExit(
+            f"{workers} воркеров не помещаются в {budget} соединений Postgres: "
+            "уменьшите WEB_CONCURRENCY или JOB_WORKERS, либо увеличьте POSTGRES_MAX_CONNECTIONS"
+        )
+    pool_size = min(settings.DB_POOL_SIZE, per_worker)
+    max_overflow = min(settings.DB_MAX_OVERFLOW, per_worker - pool_size)
+    return pool_size, max_overflow
+
+
+def main() -> None:
+    workers = worker_count()
+    pool_size, max_overflow = pool_limits(workers)
+    # Воркеры uvicorn стартуют через spawn и читают настройки заново - передаём через окружение
+    os.environ["DB_POOL_SIZE"] = str(pool_size)
+    os.environ["DB_MAX_OVERFLOW"] = str(max_overflow)
+    # Логирование uvicorn ещё не настроено, поэтому просто print
+    print(
+        f"Starting {workers} workers: threadpool {settings.THREADPOOL_SIZE}, "
+        f"db pool {pool_size}+{max_overflow} per worker"
+    )
+    if pool_size + max_overflow < settings.THREADPOOL_SIZE:
+        print(
+            f"WARNING: THREADPOOL_SIZE={settings.THREADPOOL_SIZE} больше пула соединений "
+            f"({pool_size + max_overflow}): синхронные роуты будут ждать свободное соединение"
+        )
+
+    uvicorn.run(
+        "app.main:app",
+        host=settings.SERVER_HOST,
+        port=settings.SERVER_PORT,
+        workers=workers,
+        proxy_headers=True,
+        forwarded_allow_ips=settings.FORWARDED_ALLOW_IPS,
+        timeout_keep_alive=settings.KEEP_ALIVE_TIMEOUT_SECONDS,
+        # На SIGTERM (деплой) воркеры перестают принимать соединения и дорабатывают текущие запросы
+        timeout_graceful_shutdown=settings.GRACEFUL_TIMEOUT_SECONDS,
+    )
+
+
+if __name__ == "__main__":
+    main()
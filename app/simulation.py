@@ -0,0 +1,139 @@
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from app.core.config import settings
+
+# Монте-Карло по эмпирическому распределению результатов игрока:
+# каждое будущее - horizon турниров, выбранных с возвращением из его истории.
+
+BAND_PERCENTILES = (5, 25, 50, 75, 95)
+BAND_POINTS = 50
+
+
+class SimulationBudgetExceeded(Exception):
+    pass
+
+
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # forkserver: не форкаем воркер uvicorn вместе с его потоками и пулом соединений
+            _pool = ProcessPoolExecutor(
+                max_workers=settings.SIMULATION_WORKERS,
+                mp_context=multiprocessing.get_context("forkserver"),
+            )
+        return _pool
+
+
+def shutdown_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def _simulate_chunk(
+    profits: np.ndarray,
+    bankroll: int,
+    horizon: int,
+    paths: int,
+    checkpoints: np.ndarray,
+    seed: np.random.SeedSequence,
+    deadline: float,
+) -> tuple[int, float, np.ndarray, np.ndarray] | None:
+    # Чанки, до которых очередь пула дошла после бюджета, не считаем - их результат уже не ждут.
+    # deadline - по time.time(): monotonic в разных процессах сравнивать нельзя
+    if time.time() > deadline:
+        return None
+    rng = np.random.default_rng(seed)
+    draws = rng.integers(0, profits.size, size=(paths, horizon))
+    bankrolls = bankroll + np.cumsum(profits[draws], axis=1)
+    # После разорения игрок больше не играет - банкролл дальше остаётся нулевым
+    broke = np.logical_or.accumulate(bankrolls <= 0, axis=1)
+    bankrolls[broke] = 0
+    peaks = np.maximum(np.maximum.accumulate(bankrolls, axis=1), bankroll)
+    downswings = (peaks - bankrolls).max(axis=1)
+    return int(broke[:, -1].sum()), float(bankrolls[:, -1].sum()), downswings, bankrolls[:, checkpoints]
+
+
+def simulate(profits: np.ndarray, bankroll: int, horizon: int, simulations: int, seed: int) -> dict:
+    """
+    Риск разорения, ожидаемый даунсвинг и доверительные полосы банкролла.
+
+    Симуляции режутся на чанки со своими дочерними seed, поэтому результат
+    зависит только от seed, а не от числа процессов. При превышении бюджета
+    времени берётся непрерывный префикс готовых чанков и выставляется truncated;
+    чанки, начатые после бюджета, сразу завершаются.
+    """
+    started = time.monotonic()
+    deadline = time.time() + settings.SIMULATION_TIME_BUDGET_SECONDS
+
+    chunk_paths = max(1, settings.SIMULATION_CHUNK_STEPS // horizon)
+    sizes = [chunk_paths] * (simulations // chunk_paths)
+    if simulations % chunk_paths:
+        sizes.append(simulations % chunk_paths)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    checkpoints = np.unique(np.linspace(0, horizon - 1, min(horizon, BAND_POINTS)).round().astype(np.int64))
+    tasks = [(profits, bankroll, horizon, size, checkpoints, child, deadline) for size, child in zip(sizes, seeds)]
+
+    results = []
+    if len(tasks) == 1 or settings.SIMULATION_WORKERS <= 1:
+        for task in tasks:
+            result = _simulate_chunk(*task)
+            if result is None:
+                break
+            results.append(result)
+    else:
+        futures = [_get_pool().submit(_simulate_chunk, *task) for task in tasks]
+        for future in futures:
+            try:
+                result = future.result(timeout=max(deadline - time.time(), 0))
+            except TimeoutError:
+                break
+            if result is None:
+                break
+            results.append(result)
+        # Не начатые чанки отменяются, уже переданные в процессы сразу вернут None
+        for future in futures[len(results):]:
+            future.cancel()
+    if not results:
+        raise SimulationBudgetExceeded()
+
+    completed = sum(sizes[: len(results)])
+    ruined = sum(result[0] for result in results)
+    final_total = sum(result[1] for result in results)
+    downswings = np.concatenate([result[2] for result in results])
+    snapshots = np.concatenate([result[3] for result in results])
+    bands = np.percentile(snapshots, BAND_PERCENTILES, axis=0)
+
+    return {
+        "sample_size": int(profits.size),
+        "bankroll": bankroll,
+        "horizon": horizon,
+        "seed": seed,
+        "simulations": completed,
+        "truncated": completed < simulations,
+        "average_profit": round(float(profits.mean()), 2),
+        "risk_of_ruin": round(ruined / completed, 4),
+        "expected_final_bankroll": round(final_total / completed, 2),
+        "expected_max_downswing": round(float(downswings.mean()), 2),
+        "max_downswing_p95": round(float(np.percentile(downswings, 95)), 2),
+        "bands": [
+            {
+                "tournament": int(point) + 1,
+                **{f"p{percentile}": round(float(value), 2) for percentile, value in zip(BAND_PERCENTILES, bands[:, i])},
+            }
+            for i, point in enumerate(checkpoints)
+        ],
+        "elapsed_ms": round((time.monotonic() - started) * 1000, 1),
+    }
@@ -0,0 +1,265 @@
+import bisect
+import sys
+import threading
+import time
+import uuid
+from array import array
+from collections import OrderedDict
+from datetime import date, datetime
+from typing import NamedTuple
+
+from sqlalchemy import func
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.metrics import (
+    BUY_IN_TIERS, buy_in_tier, cost_expr, moment_expr, tier_expr,
+    tourney_cost, tourney_moment, tourney_winnings, winnings_expr,
+)
+from app.models import Torney
+
+# Снимок статистики игрока в памяти процесса: накопленные итоги по дням и ступеням бай-ина
+# в массивах array('q') по игровым дням. Строится из БД при первом запросе, дальше обновляется
+# роутами турниров, поэтому чтение статистики активного игрока обходится без SQL.
+
+# Только настоящие ступени, без "all" - итог по всем считается суммой
+TIER_ORDER = tuple(name for name, _, _ in BUY_IN_TIERS)
+TIER_INDEX = {name: index for index, name in enumerate(TIER_ORDER)}
+TIERS = len(TIER_ORDER)
+
+
+class StatsEntry(NamedTuple):
+    day: int  # date.toordinal()
+    tier: int
+    cost: int
+    winnings: int
+
+
+def stats_entry(tourney: Torney) -> StatsEntry:
+    return StatsEntry(
+        day=tourney_moment(tourney).date().toordinal(),
+        tier=TIER_INDEX[buy_in_tier(tourney.buy_in)],
+        cost=tourney_cost(tourney),
+        winnings=tourney_winnings(tourney),
+    )
+
+
+def _zeros(count: int) -> array:
+    return array("q", bytes(8 * count))
+
+
+# Оценка памяти одного дня: массив ячеек, ключ словаря и место в нём, элемент списка дней
+DAY_BYTES = sys.getsizeof(_zeros(3 * TIERS)) + sys.getsizeof(date.today().toordinal()) + 64
+
+
+class UserSnapshot:
+    """
+    Хранятся только дни, в которые игрок играл: days[day] - array('q') из TIERS троек
+    (турниры, вложено, выиграно), ячейка ступени tier - с индекса tier * 3.
+    Память растёт с числом игровых дней, а не с разбросом дат.
+    """
+
+    __slots__ = ("days", "order", "built_at")
+
+    def __init__(self) -> None:
+        self.days: dict[int, array] = {}
+        self.order: list[int] = []  # отсортированные ключи days
+        self.built_at = time.monotonic()
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.days) * DAY_BYTES
+
+    def add(self, entry: StatsEntry, sign: int = 1, count: int = 1) -> None:
+        cells = self.days.get(entry.day)
+        if cells is None:
+            cells = self.days[entry.day] = _zeros(3 * TIERS)
+            bisect.insort(self.order, entry.day)
+        index = entry.tier * 3
+        cells[index] += sign * count
+        cells[index + 1] += sign * entry.cost
+        cells[index + 2] += sign * entry.winnings
+        if not any(cells[tier * 3] for tier in range(TIERS)):
+            # Последний турнир дня удалён или перенесён
+            del self.days[entry.day]
+            self.order.pop(bisect.bisect_left(self.order, entry.day))
+
+    def summary(self, start: date | None = None, end: date | None = None) -> dict:
+        totals = [0, 0, 0]
+        tiers = [[0, 0, 0] for _ in range(TIERS)]
+        days = []
+        first = bisect.bisect_left(self.order, start.toordinal()) if start else 0
+        last = bisect.bisect_right(self.order, end.toordinal()) if end else len(self.order)
+        for day in self.order[first:last]:
+            cells = self.days[day]
+            day_count = day_cost = day_winnings = 0
+            for tier in range(TIERS):
+                count, cost, winnings = cells[tier * 3:tier * 3 + 3]
+                if not count:
+                    continue
+                tiers[tier][0] += count
+                tiers[tier][1] += cost
+                tiers[tier][2] += winnings
+                day_count += count
+                day_cost += cost
+                day_winnings += winnings
+            totals[0] += day_count
+            totals[1] += day_cost
+            totals[2] += day_winnings
+            days.append(_totals(day_count, day_cost, day_winnings, day=date.fromordinal(day)))
+        return {
+            **_totals(*totals),
+            "tiers": [_totals(*values, tier=TIER_ORDER[index]) for index, values in enumerate(tiers) if values[0]],
+            "days": days,
+        }
+
+
+def _totals(count: int, cost: int, winnings: int, **extra) -> dict:
+    profit = winnings - cost
+    return {
+        **extra,
+        "tournaments": count,
+        "cost": cost,
+        "winnings": winnings,
+        "profit": profit,
+        "roi": round(profit / cost * 100, 2) if cost > 0 else None,
+    }
+
+
+def build_snapshot(session: Session, user_id: uuid.UUID) -> UserSnapshot:
+    day = func.date(moment_expr).label("day")
+    tier = tier_expr.label("tier")
+    rows = session.exec(
+        select(day, tier, func.count(), func.sum(cost_expr), func.sum(winnings_expr))
+        .where(Torney.user_id == user_id)
+        .group_by(day, tier)
+        .order_by(day)
+    ).all()
+    snapshot = UserSnapshot()
+    for played, tier_name, count, cost, winnings in rows:
+        if isinstance(played, str):
+            played = date.fromisoformat(played)
+        elif isinstance(played, datetime):
+            played = played.date()
+        snapshot.add(StatsEntry(played.toordinal(), TIER_INDEX[tier_name], cost or 0, winnings or 0), count=count)
+    return snapshot
+
+
+class SnapshotCache:
+    """
+    LRU снимков с ограничением по памяти. Изменения своего воркера применяются сразу,
+    изменения других воркеров подхватываются пересборкой после ttl.
+    """
+
+    def __init__(self, max_bytes: int, ttl_seconds: float) -> None:
+        self._max_bytes = max_bytes
+        self._ttl = ttl_seconds
+        self._snapshots: OrderedDict[uuid.UUID, UserSnapshot] = OrderedDict()
+        # Только для игроков, чей снимок сейчас строится: [поколение, сколько сборок идёт]
+        self._building: dict[uuid.UUID, list[int]] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._snapshots)
+
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
+
+    def _evict(self) -> None:
+        while self._bytes > self._max_bytes and len(self._snapshots) > 1:
+            _, snapshot = self._snapshots.popitem(last=False)
+            self._bytes -= snapshot.nbytes
+
+    def _changed(self, user_id: uuid.UUID) -> None:
+        building = self._building.get(user_id)
+        if building is not None:
+            building[0] += 1
+
+    def summary(self, session: Session, user_id: uuid.UUID, start: date | None = None, end: date | None = None) -> dict:
+        with self._lock:
+            snapshot = self._snapshots.get(user_id)
+            if snapshot is not None and time.monotonic() - snapshot.built_at < self._ttl:
+                self._snapshots.move_to_end(user_id)
+                return snapshot.summary(start, end)
+            building = self._building.setdefault(user_id, [0, 0])
+            building[1] += 1
+            generation = building[0]
+
+        try:
+            snapshot = build_snapshot(session, user_id)
+        finally:
+            with self._lock:
+                # Пока читали БД, этот воркер мог изменить турниры игрока - такой снимок не кэшируем
+                fresh = building[0] == generation
+                building[1] -= 1
+                if not building[1]:
+                    del self._building[user_id]
+
+        with self._lock:
+            if fresh:
+                previous = self._snapshots.pop(user_id, None)
+                if previous is not None:
+                    self._bytes -= previous.nbytes
+                self._snapshots[user_id] = snapshot
+                self._bytes += snapshot.nbytes
+                self._evict()
+            return snapshot.summary(start, end)
+
+    def cached_summary(self, user_id: uuid.UUID, start: date | None = None, end: date | None = None) -> dict | None:
+        """Итоги из готового снимка; None, если снимка нет или он устарел - без запросов к БД"""
+        with self._lock:
+            snapshot = self._snapshots.get(user_id)
+            if snapshot is None or time.monotonic() - snapshot.built_at >= self._ttl:
+                return None
+            self._snapshots.move_to_end(user_id)
+            return snapshot.summary(start, end)
+
+    def begin(self, user_id: uuid.UUID) -> UserSnapshot | None:
+        """
+        Вызывать до коммита изменения турнира, результат передать в apply() после коммита.
+        Запоминает снимок, к которому относится изменение: снимок, собранный уже после начала
+        записи, мог прочитать новую строку из БД, и прибавлять её к нему нельзя.
+        """
+        with self._lock:
+            return self._snapshots.get(user_id)
+
+    def apply(
+        self,
+        user_id: uuid.UUID,
+        base: UserSnapshot | None,
+        old: StatsEntry | None = None,
+        new: StatsEntry | None = None,
+    ) -> None:
+        """Учитывает создание (new), удаление (old) или изменение (old и new) турнира после коммита"""
+        with self._lock:
+            self._changed(user_id)
+            snapshot = self._snapshots.get(user_id)
+            if snapshot is None:
+                return
+            self._bytes -= snapshot.nbytes
+            if snapshot is not base:
+                # Снимок пересобран между begin() и коммитом или сразу после коммита -
+                # неизвестно, есть ли в нём изменение; следующий запрос соберёт заново
+                del self._snapshots[user_id]
+                return
+            if old is not None:
+                snapshot.add(old, sign=-1)
+            if new is not None:
+                snapshot.add(new)
+            self._bytes += snapshot.nbytes
+            self._evict()
+
+    def invalidate(self, user_id: uuid.UUID) -> None:
+        with self._lock:
+            self._changed(user_id)
+            snapshot = self._snapshots.pop(user_id, None)
+            if snapshot is not None:
+                self._bytes -= snapshot.nbytes
+
+
+snapshots = SnapshotCache(
+    max_bytes=settings.STATS_SNAPSHOT_MAX_BYTES,
+    ttl_seconds=settings.STATS_SNAPSHOT_TTL_SECONDS,
+)
@@ -0,0 +1,70 @@
+"""
+Выгрузка и загрузка турниров игрока в Arrow IPC / Parquet из командной строки:
+
+    python -m app.tourney_data export player@example.com tournaments.parquet
+    python -m app.tourney_data import player@example.com tournaments.parquet
+"""
+import argparse
+import sys
+
+from sqlmodel import Session
+
+from app import columnar, crud, leaderboard
+from app.core.db import get_engine
+
+
+def export(email: str, path: str, fmt: str) -> None:
+    with Session(get_engine()) as session:
+        user = crud.get_user_by_email(session=session, email=email)
+        if user is None:
+            sys.exit(f"Пользователь {email} не найден")
+        with open(path, "wb") as output:
+            for chunk in columnar.write_stream(columnar.iter_batches(session, user.id), fmt):
+                output.write(chunk)
+    print(f"Турниры {email} выгружены в {path}")
+
+
+def load(email: str, path: str) -> None:
+    progress = columnar.ImportProgress()
+    with Session(get_engine()) as session:
+        user = crud.get_user_by_email(session=session, email=email)
+        if user is None:
+            sys.exit(f"Пользователь {email} не найден")
+        try:
+            with open(path, "rb") as source:
+                columnar.import_batches(session, user.id, columnar.read_batches(source), progress)
+        except columnar.ColumnarError as e:
+            session.rollback()
+            print(f"Ошибка: {e}")
+        except BaseException:
+            # Ошибка базы или Ctrl+C: закоммиченные пачки всё равно попадают в агрегаты
+            session.rollback()
+            raise
+        finally:
+            written = leaderboard.refresh_for_moments(session, user.id, progress.months)
+            session.commit()
+            leaderboard.apply_periods(user.id, written)
+            print(f"Загружено {progress.imported}, пропущено (уже есть) {progress.skipped}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Турниры игрока в Arrow IPC / Parquet")
+    commands = parser.add_subparsers(dest="command", required=True)
+    export_parser = commands.add_parser("export")
+    export_parser.add_argument("email")
+    export_parser.add_argument("path")
+    export_parser.add_argument("--format", choices=("arrow", "parquet"), help="по умолчанию - по расширению файла")
+    import_parser = commands.add_parser("import")
+    import_parser.add_argument("email")
+    import_parser.add_argument("path")
+    args = parser.parse_args()
+
+    if args.command == "export":
+        fmt = args.format or ("parquet" if args.path.endswith(".parquet") else "arrow")
+        export(args.email, args.path, fmt)
+    else:
+        load(args.email, args.path)
+
+
+if __name__ == "__main__":
+    main()
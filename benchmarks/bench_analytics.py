@@ -0,0 +1,76 @@
+"""
+Бенчмарк векторной аналитики против построчного подсчёта на Python.
+
+    python -m benchmarks.bench_analytics --rows 50000
+"""
+import argparse
+import time
+from datetime import datetime
+
+import numpy as np
+
+from app.analytics import TourneyColumns, compute_curve
+
+
+def synthetic_columns(rows: int, seed: int = 42) -> TourneyColumns:
+    rng = np.random.default_rng(seed)
+    buy_in = rng.choice([5, 11, 22, 55, 109, 215], size=rows).astype(np.int64)
+    re_entry = rng.binomial(2, 0.15, size=rows).astype(np.int64)
+    # Призы редкие и с тяжёлым хвостом, как в реальных МТТ
+    itm = rng.random(rows) < 0.15
+    prize = np.where(itm, (buy_in * rng.pareto(1.3, size=rows) * 3).astype(np.int64), 0)
+    bounty = np.where(rng.random(rows) < 0.3, buy_in // 2, 0).astype(np.int64)
+    start = np.datetime64(datetime(2020, 1, 1), "us")
+    play_date = start + np.sort(rng.integers(0, 5 * 365 * 24 * 3600, size=rows)).astype("timedelta64[s]")
+    return TourneyColumns(play_date, buy_in, re_entry, bounty, prize)
+
+
+def python_curve(columns: TourneyColumns, window: int) -> tuple[int, list[float]]:
+    """Тот же расчёт построчно - как это выглядело бы по ORM-объектам"""
+    rows = list(zip(columns.buy_in.tolist(), columns.re_entry.tolist(), columns.bounty.tolist(), columns.prize.tolist()))
+    cumulative, peak, max_drawdown = 0, 0, 0
+    profits, costs, rolling_roi = [], [], []
+    for buy_in, re_entry, bounty, prize in rows:
+        cost = buy_in * (1 + re_entry)
+        profit = prize + bounty - cost
+        cumulative += profit
+        peak = max(peak, cumulative)
+        max_drawdown = max(max_drawdown, peak - cumulative)
+        profits.append(profit)
+        costs.append(cost)
+        window_cost = sum(costs[-window:])
+        rolling_roi.append(sum(profits[-window:]) * 100 / window_cost if window_cost else float("nan"))
+    return max_drawdown, rolling_roi
+
+
+def measure(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--window", type=int, default=100)
+    parser.add_argument("--points", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    columns = synthetic_columns(args.rows)
+    vectorized = compute_curve(columns, points=args.points, window=args.window)
+    max_drawdown, _ = python_curve(columns, args.window)
+    assert vectorized["max_drawdown"] == max_drawdown
+
+    numpy_time = measure(lambda: compute_curve(columns, points=args.points, window=args.window), args.repeat)
+    python_time = measure(lambda: python_curve(columns, args.window), max(1, args.repeat // 2))
+    print(f"rows={args.rows} window={args.window} points={args.points}")
+    print(f"numpy:  {numpy_time * 1000:9.2f} ms")
+    print(f"python: {python_time * 1000:9.2f} ms  (x{python_time / numpy_time:.1f})")
+
+
+if __name__ == "__main__":
+    main()
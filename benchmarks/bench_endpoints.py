@@ -0,0 +1,132 @@
+"""
+Задержки основных эндпоинтов на текущей базе - после python -m app.seed_data.
+
+    python -m benchmarks.bench_endpoints --repeat 20
+    python -m benchmarks.bench_endpoints --json before.json   # сохранить, чтобы сравнить после изменений
+
+Игроки берутся из сгенерированных по квантилям объёма (p50, p90, p99, max):
+индексы и кэши ведут себя по-разному у игрока с сотней турниров и с сотней тысяч.
+Запросы идут через TestClient в этом же процессе - в замер входят приложение и БД, но не сеть.
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+from datetime import timedelta
+
+# Настройки читаются при импорте app: лимиты и фоновые воркеры замеру только мешают
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+os.environ.setdefault("JOB_WORKERS", "0")
+os.environ.setdefault("DB_CREATE_TABLES_ON_STARTUP", "false")
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import func  # noqa: E402
+from sqlmodel import Session, select  # noqa: E402
+
+from app.core.db import get_engine  # noqa: E402
+from app.core.security import create_access_token  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models import Torney, User  # noqa: E402
+from app.seed_data import DEFAULT_DOMAIN, seed_emails  # noqa: E402
+
+QUANTILES = (("p50", 0.5), ("p90", 0.9), ("p99", 0.99), ("max", 1.0))
+
+
+def sample_users(domain: str) -> list[tuple[str, str, int, object]]:
+    """(квантиль, user_id, турниров, последняя дата) для игроков разного объёма"""
+    with Session(get_engine()) as session:
+        rows = session.exec(
+            select(Torney.user_id, func.count(), func.max(Torney.play_date))
+            .join(User, User.id == Torney.user_id)
+            .where(User.email.like(seed_emails(domain)))
+            .group_by(Torney.user_id)
+            .order_by(func.count(), Torney.user_id)
+        ).all()
+    if not rows:
+        raise SystemExit(f"Нет сгенерированных игроков @{domain}: сначала python -m app.seed_data")
+    return [
+        (label, str(rows[min(int(quantile * len(rows)), len(rows) - 1)][0]), *rows[min(int(quantile * len(rows)), len(rows) - 1)][1:])
+        for label, quantile in QUANTILES
+    ]
+
+
+def endpoints(last_played) -> list[tuple[str, str, str, dict]]:
+    """(название, метод, путь, параметры) - то, что открывает дашборд игрока"""
+    day = last_played.replace(hour=0, minute=0, second=0, microsecond=0)
+    period = last_played.strftime("%Y-%m")
+    windows = {
+        "today": {"start_date": day.isoformat()},
+        "week": {"start_date": (day - timedelta(days=day.weekday())).isoformat()},
+        "month": {"start_date": day.replace(day=1).isoformat()},
+        "ytd": {"start_date": day.replace(month=1, day=1).isoformat()},
+    }
+    return [
+        ("my_tourney 30d", "GET", "/v1/tournaments/my_tourney/",
+         {"params": {"start_date": (day - timedelta(days=30)).isoformat(), "end_date": last_played.isoformat()}}),
+        ("query windows", "POST", "/v1/tournaments/query", {"json": {"windows": windows}}),
+        ("stats", "GET", "/v1/stats/", {}),
+        ("series", "GET", "/v1/series/", {"params": {"order_by": "profit"}}),
+        ("search", "GET", "/v1/tournaments/search", {"params": {"q": "bounty"}}),
+        ("curve", "GET", "/v1/analytics/curve", {}),
+        ("leaderboard", "GET", "/v1/leaderboards/profit", {"params": {"period": period}}),
+        ("leaderboard me", "GET", "/v1/leaderboards/roi/me", {"params": {"period": period}}),
+        ("export parquet", "GET", "/v1/tournaments/export", {"params": {"format": "parquet"}}),
+    ]
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=10, help="тёплых повторов на эндпоинт")
+    parser.add_argument("--domain", default=DEFAULT_DOMAIN)
+    parser.add_argument("--only", nargs="*", help="названия эндпоинтов")
+    parser.add_argument("--json", help="сохранить результаты в файл")
+    args = parser.parse_args()
+
+    users = sample_users(args.domain)
+    report = []
+    # Ошибка одного эндпоинта (например, нет pg_trgm для поиска) не должна обрывать весь отчёт
+    with TestClient(app, raise_server_exceptions=False) as client:
+        print(f"{'endpoint':<16} {'user':<4} {'rows':>8} {'first':>9} {'p50':>9} {'p95':>9} {'max':>9}  (ms)")
+        for label, user_id, volume, last_played in users:
+            headers = {"Authorization": "Bearer " + create_access_token(user_id, timedelta(hours=1))}
+            for name, method, path, options in endpoints(last_played):
+                if args.only and name not in args.only:
+                    continue
+                timings = []
+                # Первый вызов отдельно: холодные кэши (снимки статистики, лидерборды, страницы Postgres)
+                for _ in range(args.repeat + 1):
+                    started = time.perf_counter()
+                    response = client.request(method, path, headers=headers, **options)
+                    timings.append((time.perf_counter() - started) * 1000)
+                    if response.status_code != 200:
+                        break
+                if response.status_code != 200:
+                    report.append({"endpoint": name, "user": label, "rows": volume, "status": response.status_code})
+                    print(f"{name:<16} {label:<4} {volume:>8}  HTTP {response.status_code}")
+                    continue
+                first, warm = timings[0], timings[1:] or timings
+                row = {
+                    "endpoint": name, "user": label, "rows": volume, "first_ms": round(first, 2),
+                    "p50_ms": round(statistics.median(warm), 2), "p95_ms": round(percentile(warm, 0.95), 2),
+                    "max_ms": round(max(warm), 2),
+                }
+                report.append(row)
+                print(
+                    f"{name:<16} {label:<4} {volume:>8} {first:>9.1f} {row['p50_ms']:>9.1f} "
+                    f"{row['p95_ms']:>9.1f} {row['max_ms']:>9.1f}"
+                )
+
+    if args.json:
+        with open(args.json, "w") as output:
+            json.dump(report, output, indent=2)
+        print(f"Сохранено в {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+import os
+
+# Настройки читаются при импорте app.core.config - для тестов хватит заглушек окружения,
+# к Postgres тесты не подключаются
+os.environ.setdefault("SECRET_KEY", "test-secret-key-test-secret-key-0")
+os.environ.setdefault("POSTGRES_SERVER", "localhost")
+os.environ.setdefault("POSTGRES_USER", "postgres")
+os.environ.setdefault("POSTGRES_PASSWORD", "postgres")
+os.environ.setdefault("POSTGRES_DB", "poker")
+
+import pytest
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel, create_engine
+
+from app import crud
+from app.models import User
+
+
+@pytest.fixture
+def session():
+    """SQLite в памяти со схемой из моделей"""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    SQLModel.metadata.create_all(engine)
+    # Кэш id серий живёт в процессе, а база у каждого теста своя
+    crud._series_ids.clear()
+    with Session(engine) as session:
+        yield session
+    engine.dispose()
+
+
+@pytest.fixture
+def make_user(session):
+    def make(email: str) -> User:
+        user = User(email=email, hashed_password="-")
+        session.add(user)
+        session.commit()
+        return user
+    return make
@@ -0,0 +1,72 @@
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from app.analytics import columns_from_rows, compute_curve, downsample_indices, fetch_columns
+from app.models import Torney
+from benchmarks.bench_analytics import python_curve, synthetic_columns
+
+
+def rows(*results: tuple[int, int]) -> list[tuple]:
+    """(buy_in, prize) по одному турниру в день"""
+    start = datetime(2026, 5, 1)
+    return [(start + timedelta(days=day), buy_in, 0, 0, prize) for day, (buy_in, prize) in enumerate(results)]
+
+
+def test_drawdown_between_peak_and_trough():
+    # Прибыль: +40, -10, -10, -10, +5 -> пик 40 после первого, дно 10 после четвёртого
+    curve = compute_curve(columns_from_rows(rows((10, 50), (10, 0), (10, 0), (10, 0), (10, 15))), window=2)
+
+    assert curve["tournaments"] == 5
+    assert (curve["total_cost"], curve["total_profit"], curve["roi"]) == (50, 15, 30.0)
+    assert curve["cumulative_profit"] == [40, 30, 20, 10, 15]
+    assert curve["max_drawdown"] == 30
+    assert curve["max_drawdown_start"] == datetime(2026, 5, 1)
+    assert curve["max_drawdown_end"] == datetime(2026, 5, 4)
+    assert curve["rolling_roi"] == [400.0, 150.0, -100.0, -100.0, -25.0]
+    assert curve["rolling_stddev"][0] is None
+
+
+def test_losing_start_is_a_drawdown_without_peak():
+    curve = compute_curve(columns_from_rows(rows((10, 0), (10, 0))))
+    assert curve["max_drawdown"] == 20
+    assert curve["max_drawdown_start"] is None
+    assert curve["stddev"] == 0.0
+
+
+def test_empty():
+    curve = compute_curve(columns_from_rows([]))
+    assert curve["tournaments"] == 0 and curve["roi"] is None and curve["play_date"] == []
+
+
+def test_matches_row_by_row_calculation():
+    columns = synthetic_columns(3_000, seed=7)
+    curve = compute_curve(columns, points=3_000, window=50)
+    max_drawdown, rolling_roi = python_curve(columns, window=50)
+
+    assert curve["max_drawdown"] == max_drawdown
+    expected = [None if np.isnan(value) else round(value, 2) for value in rolling_roi]
+    assert curve["rolling_roi"] == expected
+    profit = columns.profit
+    assert curve["stddev"] == round(float(np.std(profit, ddof=1)), 2)
+
+
+def test_downsampling_keeps_extremes():
+    indices = downsample_indices(1_000, 10, keep=(333, 777))
+    assert indices[0] == 0 and indices[-1] == 999
+    assert {333, 777} <= set(indices.tolist())
+    assert downsample_indices(5, 10).tolist() == [0, 1, 2, 3, 4]
+
+
+def test_fetch_columns_bounds_with_offset(session, make_user):
+    user = make_user("player@example.com")
+    session.add_all([
+        Torney(name="A", user_id=user.id, buy_in=5, play_date=datetime(2026, 5, 2, 20, 30)),
+        Torney(name="B", user_id=user.id, buy_in=10, play_date=datetime(2026, 5, 2, 21, 30)),
+    ])
+    session.commit()
+    # 3 мая 00:00 по Москве - 2 мая 21:00 UTC
+    moscow = timezone(timedelta(hours=3))
+    columns = fetch_columns(session, user.id, start_date=datetime(2026, 5, 3, tzinfo=moscow))
+
+    assert columns.buy_in.tolist() == [10]
@@ -0,0 +1,102 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+from sqlmodel import select
+
+from app.api.deps import get_db
+from app.api.routes import auth
+from app.core import revocation
+from app.core.security import create_access_token, create_refresh_token, create_stream_token
+from app.middleware import AuthMiddleware, OptionalAuthMiddleware
+from app.models import RevokedToken
+
+
+@pytest.fixture
+def client(session):
+    app = FastAPI()
+    app.include_router(auth.router, prefix="/auth")
+    app.dependency_overrides[get_db] = lambda: session
+    return TestClient(app)
+
+
+def test_rotated_refresh_token_cannot_be_reused(client, make_user):
+    user = make_user("player@example.com")
+    token = create_refresh_token(user.id, timedelta(days=1))
+
+    first = client.post("/auth/refresh-token", json={"refresh_token": token})
+    assert first.status_code == 200
+    assert client.post("/auth/refresh-token", json={"refresh_token": token}).status_code == 401
+    # Новый токен из ротации работает
+    assert client.post("/auth/refresh-token", json={"refresh_token": first.json()["refresh_token"]}).status_code == 200
+
+
+def test_logout_revokes_access_token(client, make_user):
+    user = make_user("player@example.com")
+    headers = {"Authorization": f"Bearer {create_access_token(user.id, timedelta(minutes=5))}"}
+
+    assert client.post("/auth/logout", headers=headers).status_code == 200
+    assert client.post("/auth/logout", headers=headers).status_code == 401
+
+
+def test_optional_auth_uses_verify_token(make_user):
+    app = FastAPI()
+
+    @app.get("/whoami")
+    def whoami(request: Request):
+        return {"authenticated": request.state.authenticated, "user_id": getattr(request.state, "user_id", None)}
+
+    app.add_middleware(OptionalAuthMiddleware)
+    client = TestClient(app)
+    user = make_user("player@example.com")
+
+    def whoami_with(token):
+        return client.get("/whoami", headers={"Authorization": f"Bearer {token}"}).json()
+
+    assert whoami_with(create_access_token(user.id, timedelta(minutes=5))) == {"authenticated": True, "user_id": str(user.id)}
+    assert whoami_with(create_refresh_token(user.id, timedelta(days=1)))["authenticated"] is False
+    assert whoami_with("garbage")["authenticated"] is False
+
+
+def test_middleware_rejects_stream_token(make_user):
+    app = FastAPI()
+
+    @app.get("/v1/stats/")
+    def stats(request: Request):
+        return {"user_id": request.state.user_id}
+
+    app.add_middleware(AuthMiddleware)
+    client = TestClient(app)
+    user = make_user("player@example.com")
+
+    def status_with(token):
+        return client.get("/v1/stats/", headers={"Authorization": f"Bearer {token}"}).status_code
+
+    # Stream-токен из URL EventSource может утечь в логи - как access он не годится
+    assert status_with(create_stream_token(user.id, timedelta(seconds=60))) == 401
+    assert status_with(create_access_token(user.id, timedelta(minutes=5))) == 200
+
+
+def test_sync_picks_up_other_workers_and_prunes(session, make_user, monkeypatch):
+    monkeypatch.setattr(revocation, "get_engine", lambda: session.get_bind())
+    user = make_user("player@example.com")
+    now = datetime.now(timezone.utc)
+    store = revocation.RevocationStore()
+    store.add("expired-in-memory", (now - timedelta(seconds=1)).timestamp())
+    # Отзывы, записанные другими воркерами
+    session.add_all([
+        RevokedToken(jti="live", user_id=user.id, expires_at=now + timedelta(hours=1)),
+        RevokedToken(jti="expired", user_id=user.id, expires_at=now - timedelta(hours=1)),
+    ])
+    session.commit()
+
+    store.sync()
+    assert store.is_revoked("live")
+    assert not store.is_revoked("expired") and not store.is_revoked("expired-in-memory")
+    assert session.exec(select(RevokedToken.jti)).all() == ["live"]
+
+    session.add(RevokedToken(jti="later", user_id=user.id, expires_at=now + timedelta(hours=1)))
+    session.commit()
+    store.sync()
+    assert store.is_revoked("later") and len(store) == 2
@@ -0,0 +1,115 @@
+import io
+import uuid
+from datetime import datetime, timezone
+
+import pyarrow as pa
+import pytest
+from sqlmodel import select
+
+from app import columnar, jobs
+from app.models import LeaderboardEntry, Torney
+
+
+@pytest.fixture
+def player(session, make_user):
+    user = make_user("player@example.com")
+    session.add_all([
+        Torney(name="Sunday Million", user_id=user.id, buy_in=109, re_entry=1, prize=500, play_date=datetime(2026, 5, 3, 20)),
+        Torney(name="Bounty Builder", user_id=user.id, buy_in=33, bounty=12, play_date=datetime(2026, 5, 1, 19)),
+        Torney(name="Zodiac", user_id=user.id, buy_in=5, play_date=None),
+    ])
+    session.commit()
+    return user
+
+
+def export(session, user_id, fmt) -> bytes:
+    return b"".join(columnar.write_stream(columnar.iter_batches(session, user_id, batch_rows=2), fmt))
+
+
+@pytest.mark.parametrize("fmt", ["arrow", "parquet"])
+def test_round_trip(session, player, fmt):
+    data = export(session, player.id, fmt)
+    table = pa.Table.from_batches(list(columnar.read_batches(io.BytesIO(data))))
+
+    assert table.schema.equals(columnar.SCHEMA)
+    assert table.column("name").to_pylist() == ["Zodiac", "Bounty Builder", "Sunday Million"]
+    assert table.column("buy_in").to_pylist() == [5, 33, 109]
+    assert table.column("play_date").to_pylist()[1:] == [
+        datetime(2026, 5, 1, 19, tzinfo=timezone.utc), datetime(2026, 5, 3, 20, tzinfo=timezone.utc),
+    ]
+
+
+def test_reimport_skips_own_rows(session, player):
+    data = export(session, player.id, "parquet")
+    progress = columnar.import_batches(session, player.id, columnar.read_batches(io.BytesIO(data)), columnar.ImportProgress())
+    assert (progress.imported, progress.skipped) == (0, 3)
+
+
+def test_foreign_ids_get_new_ids(session, player, make_user):
+    other = make_user("other@example.com")
+    data = export(session, player.id, "arrow")
+    progress = columnar.import_batches(session, other.id, columnar.read_batches(io.BytesIO(data)), columnar.ImportProgress())
+
+    assert (progress.imported, progress.skipped) == (3, 0)
+    player_ids = set(session.exec(select(Torney.id).where(Torney.user_id == player.id)).all())
+    other_ids = set(session.exec(select(Torney.id).where(Torney.user_id == other.id)).all())
+    assert len(other_ids) == 3 and not player_ids & other_ids
+    assert datetime(2026, 5, 1) in progress.months
+
+
+def test_import_casts_columns(session, make_user):
+    user = make_user("player@example.com")
+    batch = pa.RecordBatch.from_pydict({
+        "name": ["Hot $22"],
+        "buy_in": pa.array([22], type=pa.int32()),
+        "play_date": pa.array([datetime(2026, 5, 1, 12)], type=pa.timestamp("s")),
+        "unknown": ["ignored"],
+    })
+    progress = columnar.import_batches(session, user.id, [batch], columnar.ImportProgress())
+
+    tourney = session.exec(select(Torney).where(Torney.user_id == user.id)).one()
+    assert progress.imported == 1
+    assert (tourney.buy_in, tourney.play_date, tourney.series_id is not None) == (22, datetime(2026, 5, 1, 12), True)
+
+
+@pytest.mark.parametrize("batch, message", [
+    (pa.RecordBatch.from_pydict({"buy_in": [1]}), "name"),
+    (pa.RecordBatch.from_pydict({"name": ["A"], "buy_in": ["много"]}), "buy_in"),
+    (pa.RecordBatch.from_pydict({"name": ["A"], "play_date": [datetime(2200, 1, 1)]}), "play_date"),
+    (pa.RecordBatch.from_pydict({"name": ["A", "B"], "prize": [None, 2**31]}), "prize"),
+])
+def test_import_rejects_bad_rows(session, make_user, batch, message):
+    user = make_user("player@example.com")
+    with pytest.raises(columnar.ColumnarError, match=message):
+        columnar.import_batches(session, user.id, [batch], columnar.ImportProgress())
+
+
+def test_unknown_format():
+    with pytest.raises(columnar.ColumnarError):
+        list(columnar.read_batches(io.BytesIO(b"id,name\n")))
+
+
+def test_import_job_refreshes_aggregates_after_any_error(session, make_user, tmp_path):
+    user = make_user("player@example.com")
+    path = tmp_path / "import.arrows"
+    batches = [
+        pa.RecordBatch.from_pydict({"name": ["A"], "buy_in": [10], "play_date": [datetime(2026, 5, 1, 12)]}),
+        pa.RecordBatch.from_pydict({"name": ["B"], "buy_in": [20], "play_date": [datetime(2026, 6, 1, 12)]}),
+    ]
+    with pa.OSFile(str(path), "wb") as sink, pa.ipc.new_stream(sink, batches[0].schema) as writer:
+        for batch in batches:
+            writer.write_batch(batch)
+
+    class FailingContext(jobs.JobContext):
+        def progress(self, fraction, message=None):
+            # Как DataError из базы на второй пачке - не ColumnarError
+            raise RuntimeError("connection lost")
+
+    context = FailingContext(uuid.uuid4(), "tournaments_import", user.id, {"path": str(path)}, "test")
+    with pytest.raises(RuntimeError):
+        jobs._import_tournaments(session, context)
+
+    assert not path.exists()
+    entries = session.exec(select(LeaderboardEntry).where(LeaderboardEntry.user_id == user.id)).all()
+    # Первая пачка закоммичена до ошибки и попала в лидерборд, вторая откатилась
+    assert entries and {(entry.period, entry.tournaments) for entry in entries} == {("2026-05", 1)}
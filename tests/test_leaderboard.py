@@ -0,0 +1,71 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlmodel import select
+
+from app import leaderboard
+from app.leaderboard import RankedBoard, entry_score, period_key
+from app.metrics import tourney_moment
+from app.models import LeaderboardEntry, Torney
+
+
+def test_ranks_share_ties():
+    board = RankedBoard()
+    a, b, c, d = (uuid.uuid4() for _ in range(4))
+    board.upsert(a, 100.0)
+    board.upsert(b, 250.0)
+    board.upsert(c, 100.0)
+    board.upsert(d, -5.0)
+
+    assert len(board) == 4
+    assert [board.rank(user) for user in (b, a, c, d)] == [1, 2, 2, 4]
+    assert [(rank, score) for rank, _, score in board.page(0, 10)] == [(1, 250.0), (2, 100.0), (2, 100.0), (4, -5.0)]
+    assert [user for _, user, _ in board.page(1, 2)] == sorted([a, c])
+
+
+def test_upsert_moves_and_none_removes():
+    board = RankedBoard()
+    a, b = uuid.uuid4(), uuid.uuid4()
+    board.upsert(a, 10.0)
+    board.upsert(b, 20.0)
+    board.upsert(a, 30.0)
+    assert (board.rank(a), board.rank(b)) == (1, 2)
+
+    board.upsert(a, None)
+    assert board.rank(a) is None and board.score(a) is None
+    assert board.rank(b) == 1 and len(board) == 1
+    board.discard(uuid.uuid4())
+
+
+def test_roi_needs_sample(monkeypatch):
+    monkeypatch.setattr(leaderboard.settings, "LEADERBOARD_ROI_MIN_TOURNAMENTS", 10)
+    assert entry_score("roi", 9, 100, 50) is None
+    assert entry_score("roi", 10, 100, 50) == 50.0
+    assert entry_score("roi", 10, 0, 50) is None
+    assert entry_score("profit", 1, 100, -30) == -30.0
+    assert entry_score("volume", 7, 100, -30) == 7.0
+
+
+def test_write_user_period_upserts_and_drops_empty_tiers(session, make_user):
+    user = make_user("player@example.com")
+    micro = Torney(name="A", user_id=user.id, buy_in=5, prize=20, play_date=datetime(2026, 5, 3))
+    high = Torney(name="B", user_id=user.id, buy_in=300, play_date=datetime(2026, 5, 4))
+    session.add_all([micro, high])
+    session.flush()
+    written = leaderboard.refresh_for_moments(session, user.id, [micro.play_date, high.play_date])
+    session.commit()
+    assert written == {"2026-05": {"micro": (1, 5, 15), "high": (1, 300, -300), "all": (2, 305, -285)}}
+
+    session.delete(high)
+    session.flush()
+    leaderboard.refresh_for_moments(session, user.id, [high.play_date])
+    session.commit()
+    rows = session.exec(select(LeaderboardEntry).where(LeaderboardEntry.user_id == user.id)).all()
+    assert sorted((row.tier, row.tournaments, row.profit) for row in rows) == [("all", 1, 15), ("micro", 1, 15)]
+
+
+def test_offset_play_date_buckets_by_utc():
+    played = datetime(2026, 11, 1, 1, tzinfo=timezone(timedelta(hours=3)))
+    tourney = Torney(name="A", user_id=uuid.uuid4(), buy_in=5, play_date=played)
+    assert tourney_moment(tourney) == datetime(2026, 10, 31, 22)
+    assert period_key(tourney_moment(tourney)) == "2026-10"
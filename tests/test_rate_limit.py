@@ -0,0 +1,107 @@
+import asyncio
+
+import pytest
+
+from app.core.rate_limit import InMemoryBackend, Limit, LocalBucketStore, SharedStoreBackend, parse_limit, take_token
+
+
+def test_parse_limit():
+    assert parse_limit("email:5/minute") == Limit(key="email", capacity=5, per_seconds=60)
+    assert parse_limit("ip:20/second").rate == 20.0
+
+
+@pytest.mark.parametrize("spec", ["5/minute", "host:5/minute", "ip:0/minute", "ip:5/week", "ip:x/minute"])
+def test_parse_limit_rejects(spec):
+    with pytest.raises(ValueError):
+        parse_limit(spec)
+
+
+def test_burst_then_refill():
+    limit = Limit(key="ip", capacity=3, per_seconds=60)  # один токен в 20 секунд
+    state, now = None, 1000.0
+    for _ in range(3):
+        state, allowed, retry_after = take_token(state, now, limit)
+        assert allowed and retry_after == 0.0
+
+    state, allowed, retry_after = take_token(state, now, limit)
+    assert not allowed and retry_after == pytest.approx(20.0)
+
+    state, allowed, retry_after = take_token(state, now + 10, limit)
+    assert not allowed and retry_after == pytest.approx(10.0)
+    state, allowed, _ = take_token(state, now + 20, limit)
+    assert allowed
+
+
+def test_refill_is_capped_and_clock_skew_ignored():
+    limit = Limit(key="ip", capacity=2, per_seconds=10)
+    state, _, _ = take_token(None, 0.0, limit)
+    state, allowed, _ = take_token(state, 3600.0, limit)
+    assert allowed and state[0] == pytest.approx(1.0)
+    # Время откатилось назад - токены не отнимаются и не добавляются
+    state, allowed, _ = take_token(state, 3000.0, limit)
+    assert allowed and state[0] == pytest.approx(0.0)
+
+
+@pytest.mark.parametrize("backend", [InMemoryBackend(), SharedStoreBackend(LocalBucketStore())], ids=["memory", "shared"])
+def test_backends_limit_per_key(backend):
+    limit = Limit(key="ip", capacity=2, per_seconds=3600)
+
+    async def run():
+        return [
+            (await backend.hit("a", limit))[0] for _ in range(3)
+        ] + [(await backend.hit("b", limit))[0]]
+
+    assert asyncio.run(run()) == [True, True, False, True]
+
+
+def rate_limited_client(rules):
+    from fastapi import FastAPI, Request
+    from fastapi.testclient import TestClient
+
+    from app.middleware import RateLimitMiddleware
+
+    app = FastAPI()
+    app.state.calls = 0
+
+    @app.post("/login")
+    async def login(request: Request):
+        app.state.calls += 1
+        if request.headers.get("content-type", "").startswith("application/json"):
+            return await request.json()
+        return dict(await request.form())
+
+    app.add_middleware(RateLimitMiddleware, rules=rules, backend=InMemoryBackend())
+    return app, TestClient(app)
+
+
+def test_middleware_rejects_with_retry_after_before_route():
+    app, client = rate_limited_client({"POST /login": ["email:2/minute"]})
+    for _ in range(2):
+        assert client.post("/login", json={"email": "A@example.com"}).status_code == 200
+
+    response = client.post("/login", json={"email": "a@example.com "})
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) == 30
+    assert app.state.calls == 2
+    # Другой email - своё ведро
+    assert client.post("/login", json={"email": "b@example.com"}).status_code == 200
+
+
+def test_middleware_replays_body_to_route():
+    _, client = rate_limited_client({"POST /login": ["email:5/minute"]})
+    assert client.post("/login", json={"email": "a@example.com", "password": "x"}).json() == {
+        "email": "a@example.com",
+        "password": "x",
+    }
+    assert client.post("/login", data={"username": "a@example.com", "password": "x"}).json() == {
+        "username": "a@example.com",
+        "password": "x",
+    }
+
+
+def test_middleware_ignores_forwarded_for():
+    app, client = rate_limited_client({"POST /login": ["ip:1/minute"]})
+    assert client.post("/login", json={}, headers={"X-Forwarded-For": "10.0.0.1"}).status_code == 200
+    # Подмена заголовка не даёт нового ведра - адрес берётся из соединения
+    assert client.post("/login", json={}, headers={"X-Forwarded-For": "10.0.0.2"}).status_code == 429
+    assert app.state.calls == 1
@@ -0,0 +1,51 @@
+from datetime import datetime
+
+from app.core.config import settings
+from app.models import Torney
+from app.search import name_score, search_tournaments
+
+
+def add(session, user, name, day=1):
+    session.add(Torney(name=name, user_id=user.id, buy_in=10, play_date=datetime(2026, 5, day)))
+
+
+def names(hits):
+    return [tourney.name for tourney, _ in hits]
+
+
+def test_name_score():
+    assert name_score("million", "sunday million $109") == 1.0
+    assert name_score("sundy milion", "sunday million $109") >= settings.SEARCH_SIMILARITY_THRESHOLD
+    assert name_score("sundy milion", "bounty builder $33") < settings.SEARCH_SIMILARITY_THRESHOLD
+    assert name_score("zodiac", "sunday million $109") == 0.0
+
+
+def test_typos_are_found(session, make_user):
+    user = make_user("player@example.com")
+    add(session, user, "Sunday Million $109")
+    add(session, user, "Bounty Builder $33")
+    session.commit()
+
+    assert names(search_tournaments(session, user.id, "sundy milion", 10, 0)) == ["Sunday Million $109"]
+
+
+def test_prefix_first_then_score_then_recent(session, make_user):
+    user = make_user("player@example.com")
+    add(session, user, "Mini Sunday Million", day=3)
+    add(session, user, "Sunday Million", day=1)
+    add(session, user, "Sunday Million", day=2)
+    add(session, user, "Zodiac $5")
+    session.commit()
+
+    hits = search_tournaments(session, user.id, "  sunday   million ", 10, 0)
+    assert names(hits) == ["Sunday Million", "Sunday Million", "Mini Sunday Million"]
+    assert hits[0][0].play_date > hits[1][0].play_date
+    assert names(search_tournaments(session, user.id, "sunday million", 1, 1)) == ["Sunday Million"]
+
+
+def test_only_own_tournaments(session, make_user):
+    player, other = make_user("player@example.com"), make_user("other@example.com")
+    add(session, other, "Sunday Million")
+    session.commit()
+
+    assert search_tournaments(session, player.id, "sunday million", 10, 0) == []
@@ -0,0 +1,40 @@
+import time
+
+import numpy as np
+import pytest
+
+from app import simulation
+from app.core.config import settings
+
+PROFITS = np.array([-110, -110, -55, -22, 0, 40, 300, 1200], dtype=np.int64)
+
+
+@pytest.fixture
+def budget(monkeypatch):
+    monkeypatch.setattr(settings, "SIMULATION_TIME_BUDGET_SECONDS", 60)
+    monkeypatch.setattr(settings, "SIMULATION_CHUNK_STEPS", 10_000)  # 100 путей по 100 турниров
+    yield
+    simulation.shutdown_pool()
+
+
+def run():
+    result = simulation.simulate(PROFITS, bankroll=2000, horizon=100, simulations=1000, seed=42)
+    result.pop("elapsed_ms")
+    return result
+
+
+def test_same_seed_same_result_serial_and_pool(budget, monkeypatch):
+    monkeypatch.setattr(settings, "SIMULATION_WORKERS", 1)
+    serial = run()
+    monkeypatch.setattr(settings, "SIMULATION_WORKERS", 2)
+    pooled = run()
+
+    assert serial == pooled
+    assert serial["simulations"] == 1000 and not serial["truncated"]
+
+
+def test_chunk_started_after_deadline_is_skipped():
+    seed = np.random.SeedSequence(1)
+    assert simulation._simulate_chunk(PROFITS, 100, 10, 5, np.array([9]), seed, time.time() - 1) is None
+    ruined, _, downswings, bands = simulation._simulate_chunk(PROFITS, 100, 10, 5, np.array([9]), seed, time.time() + 60)
+    assert 0 <= ruined <= 5 and downswings.shape == (5,) and bands.shape == (5, 1)
@@ -0,0 +1,94 @@
+import uuid
+from datetime import date, datetime
+
+from app.models import Torney
+from app.snapshots import DAY_BYTES, TIER_INDEX, SnapshotCache, StatsEntry, UserSnapshot, stats_entry
+
+
+def entry(day: date, tier: str = "micro", cost: int = 10, winnings: int = 0) -> StatsEntry:
+    return StatsEntry(day.toordinal(), TIER_INDEX[tier], cost, winnings)
+
+
+def test_far_apart_days_stay_small():
+    snapshot = UserSnapshot()
+    snapshot.add(entry(date(1, 1, 1)))
+    snapshot.add(entry(date(9999, 12, 31)))
+    snapshot.add(entry(date(2026, 5, 1)))
+    assert snapshot.nbytes == 3 * DAY_BYTES
+    assert [day["day"] for day in snapshot.summary()["days"]] == [date(1, 1, 1), date(2026, 5, 1), date(9999, 12, 31)]
+
+
+def test_summary_range_and_tiers():
+    snapshot = UserSnapshot()
+    snapshot.add(entry(date(2026, 5, 1), "micro", cost=5, winnings=20))
+    snapshot.add(entry(date(2026, 5, 2), "high", cost=300))
+    snapshot.add(entry(date(2026, 5, 2), "micro", cost=5))
+    snapshot.add(entry(date(2026, 5, 3), "low", cost=22, winnings=100))
+
+    summary = snapshot.summary(date(2026, 5, 2), date(2026, 5, 3))
+    assert (summary["tournaments"], summary["cost"], summary["winnings"], summary["profit"]) == (3, 327, 100, -227)
+    assert summary["roi"] == round(-227 / 327 * 100, 2)
+    assert [tier["tier"] for tier in summary["tiers"]] == ["micro", "low", "high"]
+    assert [(day["day"], day["tournaments"]) for day in summary["days"]] == [(date(2026, 5, 2), 2), (date(2026, 5, 3), 1)]
+    assert snapshot.summary(date(2027, 1, 1))["tournaments"] == 0
+
+
+def test_removing_last_tournament_drops_the_day():
+    snapshot = UserSnapshot()
+    played = entry(date(2026, 5, 1))
+    snapshot.add(played)
+    snapshot.add(played, sign=-1)
+    assert snapshot.nbytes == 0
+    assert snapshot.summary()["days"] == []
+
+
+def test_cache_matches_rebuild(session, make_user):
+    user = make_user("player@example.com")
+    tournaments = [
+        Torney(name="A", user_id=user.id, buy_in=buy_in, re_entry=1, prize=prize, play_date=datetime(2026, 5, day, 20))
+        for day, buy_in, prize in ((1, 5, 0), (1, 109, 500), (3, 22, 0))
+    ]
+    session.add_all(tournaments)
+    session.commit()
+
+    cache = SnapshotCache(max_bytes=1 << 20, ttl_seconds=60)
+    before = cache.summary(session, user.id)
+    assert before["tournaments"] == 3 and len(cache) == 1
+
+    moved = stats_entry(tournaments[0])
+    tournaments[0].play_date = datetime(2026, 5, 4, 20)
+    session.add(tournaments[0])
+    base = cache.begin(user.id)
+    session.commit()
+    cache.apply(user.id, base, old=moved, new=stats_entry(tournaments[0]))
+
+    rebuilt = SnapshotCache(max_bytes=1 << 20, ttl_seconds=60).summary(session, user.id)
+    assert cache.summary(session, user.id) == rebuilt
+    assert cache.nbytes == 3 * DAY_BYTES
+
+
+def test_changes_of_uncached_users_are_not_tracked():
+    cache = SnapshotCache(max_bytes=1 << 20, ttl_seconds=60)
+    for _ in range(3):
+        user_id = uuid.uuid4()
+        cache.apply(user_id, cache.begin(user_id), new=entry(date(2026, 5, 1)))
+        cache.invalidate(user_id)
+    assert cache._building == {}
+    assert len(cache) == 0 and cache.nbytes == 0
+
+
+def test_rebuild_between_commit_and_apply_is_not_counted_twice(session, make_user):
+    user = make_user("player@example.com")
+    cache = SnapshotCache(max_bytes=1 << 20, ttl_seconds=60)
+    assert cache.summary(session, user.id)["tournaments"] == 0
+
+    tourney = Torney(name="A", user_id=user.id, buy_in=5, play_date=datetime(2026, 5, 1, 20))
+    session.add(tourney)
+    base = cache.begin(user.id)
+    session.commit()
+    # Снимок устарел по ttl или вытеснен - параллельный GET /stats/ собирает его уже с новой строкой
+    cache.invalidate(user.id)
+    assert cache.summary(session, user.id)["tournaments"] == 1
+    cache.apply(user.id, base, new=stats_entry(tourney))
+
+    assert cache.summary(session, user.id)["tournaments"] == 1
@@ -0,0 +1,83 @@
+from datetime import datetime
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.deps import get_current_user, get_db
+from app.api.routes import tourney
+from app.models import Torney
+
+
+@pytest.fixture
+def player(session, make_user):
+    user = make_user("player@example.com")
+    other = make_user("other@example.com")
+    session.add_all([
+        Torney(name="Micro", user_id=user.id, buy_in=5, prize=20, play_date=datetime(2026, 5, 1, 20)),
+        Torney(name="Mid", user_id=user.id, buy_in=100, re_entry=1, play_date=datetime(2026, 5, 2, 23, 30)),
+        Torney(name="Low", user_id=user.id, buy_in=30, bounty=10, play_date=datetime(2026, 4, 30, 12)),
+        Torney(name="Foreign", user_id=other.id, buy_in=5, prize=100, play_date=datetime(2026, 5, 1, 20)),
+    ])
+    session.commit()
+    return user
+
+
+@pytest.fixture
+def client(session, player):
+    app = FastAPI()
+    app.include_router(tourney.router)
+    app.dependency_overrides[get_db] = lambda: session
+    app.dependency_overrides[get_current_user] = lambda: player
+    return TestClient(app)
+
+
+def query(client, windows, include_tournaments=False):
+    response = client.post("/tournaments/query", json={"windows": windows, "include_tournaments": include_tournaments})
+    assert response.status_code == 200, response.text
+    return response.json()["windows"]
+
+
+def test_windows_aggregate_in_one_pass(client):
+    windows = query(client, {
+        "may": {"start_date": "2026-05-01T00:00:00", "end_date": "2026-05-31T23:59:59"},
+        "micro": {"tier": "micro"},
+        "low_and_up": {"min_buy_in": 11},
+        "empty": {"start_date": "2030-01-01T00:00:00"},
+    })
+
+    assert windows["may"] == {
+        "tournaments": 2, "cost": 205, "winnings": 20, "profit": -185, "roi": -90.24, "itm": 1, "items": None,
+    }
+    assert (windows["micro"]["tournaments"], windows["micro"]["profit"], windows["micro"]["itm"]) == (1, 15, 1)
+    assert (windows["low_and_up"]["tournaments"], windows["low_and_up"]["winnings"]) == (2, 10)
+    assert windows["empty"] == {
+        "tournaments": 0, "cost": 0, "winnings": 0, "profit": 0, "roi": None, "itm": 0, "items": None,
+    }
+
+
+def test_items_are_flagged_per_window(client):
+    windows = query(client, {
+        "may": {"start_date": "2026-05-01T00:00:00", "end_date": "2026-05-31T23:59:59"},
+        "micro": {"tier": "micro"},
+        "empty": {"start_date": "2030-01-01T00:00:00"},
+    }, include_tournaments=True)
+
+    assert [item["name"] for item in windows["may"]["items"]] == ["Mid", "Micro"]
+    assert [item["name"] for item in windows["micro"]["items"]] == ["Micro"]
+    assert windows["empty"]["items"] == []
+
+
+def test_window_bounds_with_offset_are_compared_in_utc(client):
+    # 3 мая по Москве - со 2 мая 21:00 до 3 мая 20:59:59 UTC
+    windows = query(client, {
+        "moscow_day": {"start_date": "2026-05-03T00:00:00+03:00", "end_date": "2026-05-03T23:59:59+03:00"},
+    }, include_tournaments=True)
+
+    assert [item["name"] for item in windows["moscow_day"]["items"]] == ["Mid"]
+    assert windows["moscow_day"]["tournaments"] == 1
+
+
+def test_unknown_tier_is_rejected(client):
+    response = client.post("/tournaments/query", json={"windows": {"w": {"tier": "nosebleed"}}})
+    assert response.status_code == 422